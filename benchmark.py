@@ -0,0 +1,388 @@
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import operator
+import os
+import re
+import runpy
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+DAY_PATTERN = re.compile(r'^day(?P<day>\d+)$')
+
+
+class Phases:
+
+    def __init__(self, parse: Callable, part1: Optional[Callable] = None, part2: Optional[Callable] = None,
+                 mutates_input: bool = False):
+        self.parse = parse
+        self.part1 = part1
+        self.part2 = part2
+        self.mutates_input = mutates_input
+
+
+class Measurement:
+
+    def __init__(self, phase: str, wall_time: float, cpu_time: float, peak_memory: int, result=None):
+        self.phase = phase
+        self.wall_time = wall_time
+        self.cpu_time = cpu_time
+        self.peak_memory = peak_memory
+        self.result = result
+
+    def to_dict(self):
+        return {'phase': self.phase,
+                'wall_time': self.wall_time,
+                'cpu_time': self.cpu_time,
+                'peak_memory': self.peak_memory,
+                'result': None if self.result is None else str(self.result)}
+
+
+@contextlib.contextmanager
+def working_directory(path):
+    previous_path = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous_path)
+
+
+def run_quietly(function: Callable, args: tuple):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args)
+
+
+def measure(phase: str, function: Callable, get_input: Optional[Callable] = None) -> Measurement:
+    # tracemalloc slows down allocations unevenly, so the times come from a separate untraced run
+    args = () if get_input is None else (get_input(),)
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    result = run_quietly(function, args)
+    wall_time, cpu_time = time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+    args = () if get_input is None else (get_input(),)
+    tracemalloc.start()
+    try:
+        run_quietly(function, args)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return Measurement(phase, wall_time, cpu_time, peak_memory, result)
+
+
+def run_script(path: str):
+    runpy.run_path(path, run_name='__main__')
+
+
+def day1_phases(module) -> Phases:
+    return Phases(module.parse_input,
+                  module.num_increased,
+                  lambda values: module.num_increased(module.get_windows(values)))
+
+
+def day2_phases(module) -> Phases:
+    return Phases(module.load_input, module.puzzle3, module.puzzle4)
+
+
+def day3_phases(module) -> Phases:
+    return Phases(module.load_input,
+                  module.puzzle_5,
+                  lambda values: module.filter_value(values, max, 1) * module.filter_value(values, min, 0))
+
+
+def day4_phases(module) -> Phases:
+    def first_winner(bingo_input):
+        bingo_numbers, boards = bingo_input
+        for bingo_number in bingo_numbers:
+            for board in boards:
+                board.mark(bingo_number)
+                if board.is_winner():
+                    return board.sum_unmarked() * bingo_number
+        return None
+
+    def last_winner(bingo_input):
+        bingo_numbers, boards = bingo_input
+        current_round = boards
+        for bingo_number in bingo_numbers:
+            next_round = []
+            for board in current_round:
+                board.mark(bingo_number)
+                if not board.is_winner():
+                    next_round.append(board)
+            if not next_round:
+                return current_round[0].sum_unmarked() * bingo_number
+            current_round = next_round
+        return None
+
+    return Phases(module.load_input, first_winner, last_winner, mutates_input=True)
+
+
+def day5_phases(module) -> Phases:
+    return Phases(module.parse_input, module.puzzle9, module.puzzle10)
+
+
+def day6_phases(module) -> Phases:
+    return Phases(module.parse_input,
+                  lambda initial_state: module.bottom_up(initial_state, 80),
+                  lambda initial_state: module.bottom_up(initial_state, 256))
+
+
+def day7_phases(module) -> Phases:
+    def min_cost(cost_function):
+        def inner_min_cost(positions):
+            min_pos, max_pos = min(positions), max(positions)
+            return min(cost_function(positions, center) for center in range(min_pos, max_pos + 1, 1))
+
+        return inner_min_cost
+
+    return Phases(module.parse_input, min_cost(module.absolute_distance), min_cost(module.momentum_distance))
+
+
+def day8_phases(module) -> Phases:
+    def count_easy_digits(lines):
+        easy_lengths = {2, 3, 4, 7}
+        return sum(1 for line in lines for pattern in line.rstrip().split(' | ')[1].split(' ')
+                   if len(pattern) in easy_lengths)
+
+    return Phases(module.get_input, count_easy_digits, lambda lines: sum(module.decode(line) for line in lines))
+
+
+def day9_phases(module) -> Phases:
+    def basin_product(board):
+        basin_sizes = module.get_basin_sizes(board)
+        basin_sizes.sort(reverse=True)
+        return basin_sizes[0] * basin_sizes[1] * basin_sizes[2]
+
+    return Phases(module.parse_file_input,
+                  lambda board: sum(board[row][col] + 1 for row, col in module.get_low_points(board)),
+                  basin_product)
+
+
+def day10_phases(module) -> Phases:
+    def corrupted_score(lines):
+        corrupted_chars = [module.get_corrupted_character(line) for line in lines]
+        return sum(module.CORRUPTED_POINTS[character] for character in corrupted_chars if character)
+
+    def completion_score(lines):
+        completion_scores = sorted(module.get_completion(line) for line in lines
+                                   if not module.get_corrupted_character(line))
+        return completion_scores[len(completion_scores) // 2]
+
+    return Phases(module.parse_file_input, corrupted_score, completion_score)
+
+
+def day11_phases(module) -> Phases:
+    def count_flashes(board, num_steps=100):
+        total_flashes = 0
+        for _ in range(num_steps):
+            board = board.next_step()
+            total_flashes += board.count_flashes()
+        return total_flashes
+
+    def first_synchronized_step(board):
+        step = 0
+        while True:
+            step += 1
+            board = board.next_step()
+            if board.count_flashes() == board.num_rows * board.num_cols:
+                return step
+
+    return Phases(lambda: module.Board.parse(module.parse_file_input()), count_flashes, first_synchronized_step)
+
+
+def day12_phases(module) -> Phases:
+    # the graph implements only the rule of part 2, which allows one small cave to be visited twice
+    return Phases(lambda: module.Graph.parse(module.parse_file_input()),
+                  part2=lambda graph: len(graph.get_paths()))
+
+
+def day13_phases(module) -> Phases:
+    def fold_all(configuration):
+        while configuration.can_fold():
+            configuration = configuration.fold()
+        # the code letters span several lines, which would break the table
+        return ' / '.join(str(configuration).splitlines())
+
+    return Phases(lambda: module.Parser().parse(module.load_file_input()),
+                  lambda configuration: len(configuration.fold()),
+                  fold_all)
+
+
+def day14_phases(module) -> Phases:
+    def polymer_difference(num_steps):
+        def inner_polymer_difference(problem):
+            broken_problem = module.BrokenProblem.from_problem(problem)
+            for _ in range(num_steps):
+                broken_problem = broken_problem.next_step()
+            return broken_problem.difference()
+
+        return inner_polymer_difference
+
+    return Phases(lambda: module.Problem.parse(module.load_file_input()),
+                  polymer_difference(10), polymer_difference(40))
+
+
+def day15_phases(module) -> Phases:
+    return Phases(lambda: module.Board.parse(module.load_file_input()),
+                  lambda board: board.get_dijkstra_path(),
+                  lambda board: module.get_full_board(board).get_dijkstra_path())
+
+
+def day16_phases(module) -> Phases:
+    return Phases(lambda: module.parse(module.load_input()),
+                  lambda packet: packet.version_sum(),
+                  lambda packet: packet.calculate())
+
+
+def day17_phases(module) -> Phases:
+    return Phases(lambda: module.PUZZLE_AREA,
+                  lambda area: module.get_max_height(module.get_trajectories(area)),
+                  lambda area: len(module.get_trajectories(area)))
+
+
+def day18_phases(module) -> Phases:
+    return Phases(module.load_file_input, module.get_sum_magnitude, module.get_max_pair_magnitude)
+
+
+def day19_phases(module) -> Phases:
+    return Phases(module.load_test_input,
+                  lambda scanners: module.count_beacons(module.resolve_scanners(scanners)),
+                  lambda scanners: module.get_max_distance(module.resolve_scanners(scanners)))
+
+
+def day20_phases(module) -> Phases:
+    def lit_pixels(num_steps):
+        def inner_lit_pixels(puzzle_input):
+            algorithm, image = puzzle_input
+            return module.enhance_image(algorithm, image, num_steps).lit_pixels()
+
+        return inner_lit_pixels
+
+    return Phases(module.load_file_input, lit_pixels(2), lit_pixels(50))
+
+
+def day25_phases(module) -> Phases:
+    def first_stationary_step(board):
+        step = 1
+        next_board = board.next()
+        while next_board != board:
+            step += 1
+            board, next_board = next_board, next_board.next()
+        return step
+
+    return Phases(module.create_puzzle_example, first_stationary_step)
+
+
+PHASES_BY_DAY = {1: day1_phases,
+                 2: day2_phases,
+                 3: day3_phases,
+                 4: day4_phases,
+                 5: day5_phases,
+                 6: day6_phases,
+                 7: day7_phases,
+                 8: day8_phases,
+                 9: day9_phases,
+                 10: day10_phases,
+                 11: day11_phases,
+                 12: day12_phases,
+                 13: day13_phases,
+                 14: day14_phases,
+                 15: day15_phases,
+                 16: day16_phases,
+                 17: day17_phases,
+                 18: day18_phases,
+                 19: day19_phases,
+                 20: day20_phases,
+                 25: day25_phases}
+
+
+def discover_puzzles(root_dir: str = ROOT_DIR) -> List[tuple]:
+    puzzles = []
+    for entry in os.listdir(root_dir):
+        match = DAY_PATTERN.match(entry)
+        day_dir = os.path.join(root_dir, entry)
+        if not match or not os.path.isdir(day_dir):
+            continue
+        for file_name in sorted(os.listdir(day_dir)):
+            if file_name.startswith('puzzle') and file_name.endswith('.py'):
+                puzzles.append((int(match.group('day')), os.path.join(day_dir, file_name)))
+    puzzles.sort(key=operator.itemgetter(0))
+    return puzzles
+
+
+def load_module(day: int, path: str):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    module_name = 'day{0}_{1}'.format(day, re.sub(r'\W', '_', stem))
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def benchmark_puzzle(day: int, path: str) -> List[Measurement]:
+    with working_directory(os.path.dirname(path)):
+        if day not in PHASES_BY_DAY:
+            return [measure('main', lambda: run_script(path))]
+
+        module = load_module(day, path)
+        phases = PHASES_BY_DAY[day](module)
+        parse_measurement = measure('parse', phases.parse)
+        measurements = [parse_measurement]
+        for phase_name, part in [('part1', phases.part1), ('part2', phases.part2)]:
+            if part is None:
+                continue
+            get_input = phases.parse if phases.mutates_input else lambda: parse_measurement.result
+            measurements.append(measure(phase_name, part, get_input))
+        parse_measurement.result = None
+        return measurements
+
+
+def format_table(report: List[Dict]) -> str:
+    header = '{0:<6} {1:<24} {2:<6} {3:>12} {4:>12} {5:>14}  {6}'.format(
+        'day', 'puzzle', 'phase', 'wall [s]', 'cpu [s]', 'peak mem [KiB]', 'result')
+    lines = [header, '-' * len(header)]
+    for entry in report:
+        if 'error' in entry:
+            lines.append('{0:<6} {1:<24} {2}'.format(entry['day'], entry['puzzle'], 'error: ' + entry['error']))
+            continue
+        for phase in entry['phases']:
+            lines.append('{0:<6} {1:<24} {2:<6} {3:>12.6f} {4:>12.6f} {5:>14.1f}  {6}'.format(
+                entry['day'], entry['puzzle'], phase['phase'], phase['wall_time'], phase['cpu_time'],
+                phase['peak_memory'] / 1024.0, '' if phase['result'] is None else phase['result']))
+    return os.linesep.join(lines)
+
+
+def run(days: Optional[List[int]] = None) -> List[Dict]:
+    report = []
+    for day, path in discover_puzzles():
+        if days and day not in days:
+            continue
+        entry = {'day': day, 'puzzle': os.path.relpath(path, ROOT_DIR)}
+        try:
+            entry['phases'] = [measurement.to_dict() for measurement in benchmark_puzzle(day, path)]
+        except Exception as exception:
+            entry['error'] = '{0}: {1}'.format(type(exception).__name__, exception)
+        report.append(entry)
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time the parse, part 1 and part 2 phases of every dayN puzzle.')
+    parser.add_argument('days', metavar='DAY', type=int, nargs='*', help='days to run, all days by default')
+    parser.add_argument('--json', metavar='PATH', help='write the machine-readable report to PATH, or - for stdout')
+    args = parser.parse_args()
+
+    report = run(args.days)
+    if args.json == '-':
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_table(report))
+        if args.json:
+            with open(args.json, 'w') as output:
+                json.dump(report, output, indent=2)
@@ -1,3 +1,19 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from collections import deque
+from typing import Iterable, Iterator, List, TextIO, Tuple
+
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+FOLLOW_BLOCK_SIZE = 64 * 1024 * 1024
+
+
 def num_increased(values):
     counter = 0
     for right in range(1, len(values)):
@@ -16,7 +32,213 @@ def get_windows(values):
     return [values[index] + values[index + 1] + values[index + 2] for index in range(0, (len(values) // 3) * 3)]
 
 
+def read_values(stream: TextIO) -> Iterator[int]:
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield int(line)
+
+
+class IncreaseCounter:
+
+    def __init__(self, window_sizes: Iterable[int] = (1, 3), history: Iterable[int] = (),
+                 counters: List[int] = None, offset: int = 0):
+        self.window_sizes = list(window_sizes)
+        if not self.window_sizes or any(window_size < 1 for window_size in self.window_sizes):
+            raise ValueError(self.window_sizes)
+        self.history = deque(history, maxlen=max(self.window_sizes))
+        self.counters = list(counters) if counters is not None else [0] * len(self.window_sizes)
+        self.offset = offset
+
+    def add(self, value: int):
+        # sum(values[i + 1:i + 1 + k]) > sum(values[i:i + k]) reduces to values[i + k] > values[i]
+        for index, window_size in enumerate(self.window_sizes):
+            if len(self.history) >= window_size and self.history[-window_size] < value:
+                self.counters[index] += 1
+        self.history.append(value)
+
+    def to_checkpoint(self) -> dict:
+        return {'offset': self.offset,
+                'window_sizes': self.window_sizes,
+                'history': list(self.history),
+                'counters': self.counters}
+
+    def save(self, path: str):
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w') as output:
+            json.dump(self.to_checkpoint(), output)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def from_checkpoint(cls, checkpoint: dict) -> 'IncreaseCounter':
+        return cls(checkpoint['window_sizes'], checkpoint['history'], checkpoint['counters'], checkpoint['offset'])
+
+    @classmethod
+    def load(cls, path: str, window_sizes: Iterable[int] = (1, 3)) -> 'IncreaseCounter':
+        if not os.path.exists(path):
+            return cls(window_sizes)
+        with open(path, 'r') as input:
+            counter = cls.from_checkpoint(json.load(input))
+        if counter.window_sizes != list(window_sizes):
+            raise ValueError(counter.window_sizes)
+        return counter
+
+
+def stream_num_increased(values: Iterable[int], window_sizes: Iterable[int] = (1, 3)) -> List[int]:
+    counter = IncreaseCounter(window_sizes)
+    for value in values:
+        counter.add(value)
+    return counter.counters
+
+
+def consume_new_values(path: str, counter: IncreaseCounter, checkpoint_path: str = None,
+                       block_size: int = FOLLOW_BLOCK_SIZE) -> bool:
+    with open(path, 'rb') as input:
+        input.seek(0, os.SEEK_END)
+        if input.tell() < counter.offset:
+            raise ValueError(f'{path} is shorter than the checkpoint offset {counter.offset}')
+        input.seek(counter.offset)
+
+        consumed = False
+        remainder = b''
+        while True:
+            data = input.read(block_size)
+            if not data:
+                break
+            data = remainder + data
+            # the last line may still be written, so it is consumed in a later block or poll
+            split_position = data.rfind(b'\n') + 1
+            remainder = data[split_position:]
+            if split_position == 0:
+                continue
+            for line in data[:split_position].splitlines():
+                line = line.strip()
+                if line:
+                    counter.add(int(line))
+            counter.offset += split_position
+            consumed = True
+            if checkpoint_path:
+                counter.save(checkpoint_path)
+    return consumed
+
+
+def follow(path: str, checkpoint_path: str, window_sizes: Iterable[int] = (1, 3), poll_interval: float = 1.0,
+           once: bool = False):
+    counter = IncreaseCounter.load(checkpoint_path, window_sizes)
+    while True:
+        if consume_new_values(path, counter, checkpoint_path):
+            print(' '.join(map(str, counter.counters)), flush=True)
+        if once:
+            return counter.counters
+        time.sleep(poll_interval)
+
+
+def read_chunk(path: str, begin: int, end: int) -> np.ndarray:
+    # a line belongs to the chunk in which its first byte lies
+    with open(path, 'rb') as input:
+        if begin > 0:
+            input.seek(begin - 1)
+            input.readline()
+        position = input.tell()
+        if position >= end:
+            return np.empty(0, dtype=np.int64)
+        data = input.read(end - position)
+        if data and not data.endswith(b'\n'):
+            data += input.readline()
+    return np.fromstring(data, dtype=np.int64, sep=' ')
+
+
+def count_chunk(task: Tuple[str, int, int, Tuple[int, ...]]) -> Tuple[List[int], np.ndarray, np.ndarray]:
+    path, begin, end, window_sizes = task
+    values = read_chunk(path, begin, end)
+    counters = [int(np.count_nonzero(values[window_size:] > values[:-window_size]))
+                for window_size in window_sizes]
+    max_window_size = max(window_sizes)
+    return counters, values[:max_window_size].copy(), values[-max_window_size:].copy()
+
+
+def get_chunks(path: str, num_chunks: int, chunk_size: int) -> List[Tuple[int, int]]:
+    file_size = os.path.getsize(path)
+    num_chunks = max(num_chunks, -(-file_size // chunk_size), 1)
+    boundaries = [file_size * index // num_chunks for index in range(0, num_chunks + 1)]
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def parallel_num_increased(path: str, window_sizes: Iterable[int] = (1, 3), num_workers: int = None,
+                           chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[int]:
+    window_sizes = tuple(window_sizes)
+    if any(window_size < 1 for window_size in window_sizes):
+        raise ValueError(window_sizes)
+    num_workers = num_workers or os.cpu_count()
+    max_window_size = max(window_sizes)
+    tasks = [(path, begin, end, window_sizes) for begin, end in get_chunks(path, num_workers, chunk_size)]
+
+    counters = [0] * len(window_sizes)
+    carry = np.empty(0, dtype=np.int64)
+    with multiprocessing.Pool(num_workers) as pool:
+        for chunk_counters, head, tail in pool.imap(count_chunk, tasks):
+            # pairs (i, i + k) with i in the previous chunks and i + k in the current chunk
+            for index, window_size in enumerate(window_sizes):
+                left = carry[-window_size:]
+                joined = np.concatenate((left, head[:window_size]))
+                crossing = joined[window_size:] > joined[:-window_size]
+                counters[index] += chunk_counters[index] + int(np.count_nonzero(crossing[:len(left)]))
+            carry = np.concatenate((carry, head if len(head) < max_window_size else tail))[-max_window_size:]
+    return counters
+
+
+def write_random_values(path: str, num_values: int, max_value: int = 10000):
+    with open(path, 'w') as output:
+        for _ in range(0, num_values):
+            output.write(str(random.randint(0, max_value)))
+            output.write('\n')
+
+
+def benchmark_parallel(path: str, worker_counts: Iterable[int] = (1, 2, 4, 8)):
+    with open(path, 'rb') as input:
+        num_values = sum(1 for line in input if line.strip())
+    for num_workers in worker_counts:
+        start_time = time.perf_counter()
+        counters = parallel_num_increased(path, num_workers=num_workers,
+                                          chunk_size=max(os.path.getsize(path) // num_workers, 1))
+        elapsed_time = time.perf_counter() - start_time
+        print(f'workers: {num_workers}, time: {elapsed_time:.3f}s, '
+              f'readings/s: {num_values / elapsed_time:.0f}, counters: {counters}')
+
+
 if __name__ == '__main__':
-    values = parse_input()
-    print(num_increased(values))
-    print(num_increased(get_windows(values)))
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--stream', metavar='PATH', help='count increases in one pass over PATH, or - for stdin')
+    parser.add_argument('--parallel', metavar='PATH', help='count increases in PATH using worker processes')
+    parser.add_argument('--workers', metavar='N', type=int, help='number of worker processes')
+    parser.add_argument('--benchmark-parallel', metavar='PATH', help='measure readings/s of the parallel mode')
+    parser.add_argument('--generate', metavar='N', type=int, help='write N random readings to the benchmark file')
+    parser.add_argument('--follow', metavar='PATH', help='tail PATH and update the counts as readings arrive')
+    parser.add_argument('--checkpoint', metavar='PATH', help='checkpoint file of the follow mode')
+    parser.add_argument('--interval', metavar='S', type=float, default=1.0, help='polling interval in seconds')
+    parser.add_argument('--once', action='store_true', help='process the readings appended so far and exit')
+    parser.add_argument('--window', metavar='K', type=int, action='append', help='window size, 1 and 3 by default')
+    args = parser.parse_args()
+
+    window_sizes = args.window or [1, 3]
+    if args.follow:
+        follow(args.follow, args.checkpoint or args.follow + '.checkpoint', window_sizes, args.interval, args.once)
+    elif args.benchmark_parallel:
+        if args.generate:
+            write_random_values(args.benchmark_parallel, args.generate)
+        benchmark_parallel(args.benchmark_parallel)
+    elif args.parallel:
+        for counter in parallel_num_increased(args.parallel, window_sizes, args.workers):
+            print(counter)
+    elif args.stream:
+        if args.stream == '-':
+            counters = stream_num_increased(read_values(sys.stdin), window_sizes)
+        else:
+            with open(args.stream, 'r') as input:
+                counters = stream_num_increased(read_values(input), window_sizes)
+        for counter in counters:
+            print(counter)
+    else:
+        values = parse_input()
+        print(num_increased(values))
+        print(num_increased(get_windows(values)))
@@ -79,7 +79,7 @@ class Graph:
             from_node = path.tail()
             from_node_adjacency_list = self.get_neighbours(from_node)
             for to_node in from_node_adjacency_list:
-                if path.is_special_visited_twice(graph.is_special) and self.is_special(to_node) and to_node in path:
+                if path.is_special_visited_twice(self.is_special) and self.is_special(to_node) and to_node in path:
                     continue
                 if not self.is_allowed(from_node, to_node):
                     continue
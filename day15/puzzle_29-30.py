@@ -212,16 +212,13 @@ class Board:
         return Board(matrix)
 
 
-if __name__ == '__main__':
-    initial_board = Board.parse(load_file_input())
-    print(initial_board.get_dijkstra_path())
-    print(initial_board.get_low_cost_path())
+def get_full_board(initial_board: Board, num_tiles: int = 5) -> Board:
     row_board = initial_board
     full_board = None
-    for _ in range(5):
+    for _ in range(num_tiles):
         current_board = row_board
         working_board = row_board
-        for _ in range(4):
+        for _ in range(num_tiles - 1):
             current_board = current_board.shift()
             working_board = working_board.h_stack(current_board)
         if full_board is None:
@@ -229,6 +226,14 @@ if __name__ == '__main__':
         else:
             full_board = full_board.v_stack(working_board)
         row_board = row_board.shift()
+    return full_board
+
+
+if __name__ == '__main__':
+    initial_board = Board.parse(load_file_input())
+    print(initial_board.get_dijkstra_path())
+    print(initial_board.get_low_cost_path())
+    full_board = get_full_board(initial_board)
     print(full_board)
     print(full_board.get_low_cost_path())
     print(full_board.get_dijkstra_path())
@@ -47,7 +47,10 @@ class Area:
         return x > self.max_x or y < self.min_y
 
 
-def simulate(area: Area):
+PUZZLE_AREA = Area(195, 238, -93, -67)
+
+
+def get_trajectories(area: Area):
     min_vx, max_vx = 0, 1000
     min_vy, max_vy = -1000, 1000
 
@@ -62,11 +65,18 @@ def simulate(area: Area):
                     break
                 state = state.next()
                 trajectory.append(state)
+    return trajectories
+
 
+def get_max_height(trajectories) -> int:
+    return max(max(state.position[1] for state in trajectory) for trajectory in trajectories)
+
+
+def simulate(area: Area):
+    trajectories = get_trajectories(area)
     print(len(trajectories))
-    max_height = max(max(state.position[1] for state in trajectory) for trajectory in trajectories)
-    print(max_height)
+    print(get_max_height(trajectories))
 
 
 if __name__ == '__main__':
-    simulate(Area(195, 238, -93, -67))
+    simulate(PUZZLE_AREA)
@@ -209,6 +209,29 @@ class Tree:
         return InnerNode(left_node, right_node)
 
 
+def load_file_input():
+    with open('input.txt', 'r') as input:
+        return [Tree.parse(eval(line.rstrip())) for line in input]
+
+
+def get_sum_magnitude(trees):
+    total = trees[0]
+    for tree in trees[1:]:
+        total = total.add(tree)
+    return total.node.magnitude()
+
+
+def get_max_pair_magnitude(trees):
+    magnitues = []
+    for left_pos in range(0, len(trees)):
+        for right_pos in range(left_pos + 1, len(trees)):
+            left_tree = trees[left_pos]
+            right_tree = trees[right_pos]
+            magnitues.append(left_tree.add(right_tree).node.magnitude())
+            magnitues.append(right_tree.add(left_tree).node.magnitude())
+    return max(magnitues)
+
+
 if __name__ == '__main__':
     numbers = [[1, 1],
                [2, 2],
@@ -230,17 +253,5 @@ if __name__ == '__main__':
         [[[[4, 2], 2], 6], [8, 7]]
     ]
 
-    with open('input.txt', 'r') as input:
-        numbers_puzzle = [eval(line.rstrip()) for line in input]
-
-    trees = [Tree.parse(number) for number in numbers_puzzle]
-    tree = trees[0]
-    magnitues = []
-    for left_pos in range(0, len(trees)):
-        for right_pos in range(left_pos + 1, len(trees)):
-            left_tree = trees[left_pos]
-            right_tree = trees[right_pos]
-            magnitues.append(left_tree.add(right_tree).node.magnitude())
-            magnitues.append(right_tree.add(left_tree).node.magnitude())
-
-    print(max(magnitues))
\ No newline at end of file
+    trees = load_file_input()
+    print(get_max_pair_magnitude(trees))
\ No newline at end of file
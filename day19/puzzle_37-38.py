@@ -249,8 +249,7 @@ def load_test_input():
     return scanners
 
 
-if __name__ == '__main__':
-    scanners = load_test_input()
+def resolve_scanners(scanners):
     scanners[0].offset = Point3D(0, 0, 0)
     num_scanners = len(scanners)
     scanner_by_id = {scanner.number: scanner for scanner in scanners}
@@ -272,11 +271,23 @@ if __name__ == '__main__':
                     resolved_scanner_ids.add(scanner.number)
                     remaining_scanner_ids.remove(scanner.number)
 
-    resolved_scanners = list(scanner_by_id.values())
+    return list(scanner_by_id.values())
+
+
+def count_beacons(resolved_scanners) -> int:
+    return len({beacon for scanner in resolved_scanners for beacon in scanner.beacons})
+
+
+def get_max_distance(resolved_scanners) -> int:
     distances = []
     for left in range(len(resolved_scanners)):
         left_scanner = resolved_scanners[left]
         for right in range(left + 1, len(resolved_scanners)):
             right_scanner = resolved_scanners[right]
             distances.append(BeaconSet.distance(left_scanner.offset, right_scanner.offset))
-    print(max(distances))
+    return max(distances)
+
+
+if __name__ == '__main__':
+    resolved_scanners = resolve_scanners(load_test_input())
+    print(get_max_distance(resolved_scanners))
@@ -1,4 +1,22 @@
+import argparse
+import array
+import bisect
+import functools
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
 from enum import Enum
+from typing import Iterable, Iterator, Tuple
+
+import numpy as np
+
+NEWLINE = ord('\n')
+CARRIAGE_RETURN = ord('\r')
+BLOCK_SIZE = 1 << 20
+READ_BLOCK_SIZE = 8 * 1024 * 1024
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
 
 
 class Direction(Enum):
@@ -14,6 +32,9 @@ class Direction(Enum):
 
 
 STR_TO_DIRECTION = {'forward': Direction.FORWARD, 'up': Direction.UP, 'down': Direction.DOWN}
+OPCODE_TABLE = np.zeros(256, dtype=np.uint8)
+for name, direction in STR_TO_DIRECTION.items():
+    OPCODE_TABLE[ord(name[0])] = direction.value
 
 
 def load_input():
@@ -27,8 +48,7 @@ def load_input():
         return values
 
 
-def puzzle3():
-    movements = load_input()
+def puzzle3(movements):
     horizontal_pos, vertical_pos = 0, 0
     for direction, value in movements:
         if direction == Direction.DOWN:
@@ -37,11 +57,10 @@ def puzzle3():
             vertical_pos = max(vertical_pos - value, 0)
         elif direction == Direction.FORWARD:
             horizontal_pos += value
-    print(horizontal_pos * vertical_pos)
+    return horizontal_pos * vertical_pos
 
 
-def puzzle4():
-    movements = load_input()
+def puzzle4(movements):
     horizontal_pos, vertical_pos, aim = 0, 0, 0
     for direction, value in movements:
         if direction == Direction.DOWN:
@@ -51,8 +70,353 @@ def puzzle4():
         elif direction == Direction.FORWARD:
             horizontal_pos += value
             vertical_pos += aim * value
-    print(horizontal_pos * vertical_pos)
+    return horizontal_pos * vertical_pos
+
+
+def parse_columnar(buffer: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    line_ends = np.flatnonzero(buffer == NEWLINE)
+    if len(buffer) and buffer[-1] != NEWLINE:
+        line_ends = np.append(line_ends, len(buffer))
+    line_starts = np.concatenate(([0], line_ends[:-1] + 1))
+    is_non_empty = line_ends > line_starts
+    line_starts, line_ends = line_starts[is_non_empty], line_ends[is_non_empty]
+    is_non_empty = buffer[line_starts] != CARRIAGE_RETURN
+    line_starts, line_ends = line_starts[is_non_empty], line_ends[is_non_empty]
+
+    opcodes = OPCODE_TABLE[buffer[line_starts]]
+    if not opcodes.all():
+        raise ValueError(line_starts[np.argmin(opcodes)])
+
+    # direction names contain no digits, so every digit belongs to the magnitude of its line
+    digit_positions = np.flatnonzero((buffer >= ord('0')) & (buffer <= ord('9')))
+    digit_lines = np.searchsorted(line_ends, digit_positions)
+    digits_per_line = np.bincount(digit_lines, minlength=len(line_ends))
+    if not digits_per_line.all():
+        raise ValueError(line_starts[np.argmin(digits_per_line)])
+    last_digits = np.cumsum(digits_per_line)
+    first_digits = last_digits - digits_per_line
+    exponents = digit_positions[last_digits - 1][digit_lines] - digit_positions
+    digit_values = (buffer[digit_positions] - ord('0')).astype(np.int64) * np.power(10, exponents, dtype=np.int64)
+    magnitudes = np.add.reduceat(digit_values, first_digits) if len(digit_values) else digit_values
+    return opcodes, magnitudes
+
+
+def read_blocks(path: str, block_size: int = READ_BLOCK_SIZE) -> Iterator[np.ndarray]:
+    # every block ends at a line break, so the columnar parser never sees a partial line
+    with open(path, 'rb') as input:
+        remainder = b''
+        while True:
+            data = input.read(block_size)
+            if not data:
+                break
+            data = remainder + data
+            split_position = data.rfind(b'\n') + 1
+            if split_position == 0:
+                remainder = data
+                continue
+            remainder = data[split_position:]
+            yield np.frombuffer(data[:split_position], dtype=np.uint8)
+        if remainder:
+            yield np.frombuffer(remainder, dtype=np.uint8)
+
+
+def load_columnar_input(path='input.txt', block_size: int = READ_BLOCK_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    opcodes, magnitudes = [], []
+    for block in read_blocks(path, block_size):
+        block_opcodes, block_magnitudes = parse_columnar(block)
+        opcodes.append(block_opcodes)
+        magnitudes.append(block_magnitudes)
+    if not opcodes:
+        return np.empty(0, dtype=np.uint8), np.empty(0, dtype=np.int64)
+    return np.concatenate(opcodes), np.concatenate(magnitudes)
+
+
+def advance_course(opcodes: np.ndarray, magnitudes: np.ndarray, state: Tuple[int, int, int] = (0, 0, 0),
+                   block_size=BLOCK_SIZE) -> Tuple[int, int, int]:
+    """Returns the horizontal position, aim and depth after the commands starting from the given state."""
+    # depth in puzzle3 and aim in puzzle4 follow the same running sum clamped at zero:
+    # s_i = max(s_{i-1} + d_i, 0) = P_i - min(-s_0, min_{j <= i} P_j) where P is the unclamped prefix sum
+    horizontal_pos, aim, vertical_pos = state
+    for begin in range(0, len(opcodes), block_size):
+        block_opcodes = opcodes[begin:begin + block_size]
+        block_magnitudes = magnitudes[begin:begin + block_size].astype(np.int64, copy=False)
+        is_forward = block_opcodes == Direction.FORWARD.value
+        deltas = np.where(block_opcodes == Direction.DOWN.value, block_magnitudes, 0) \
+                 - np.where(block_opcodes == Direction.UP.value, block_magnitudes, 0)
+        prefix_sums = np.cumsum(deltas)
+        clamped_sums = prefix_sums - np.minimum(np.minimum.accumulate(prefix_sums), -aim)
+
+        forward_magnitudes = block_magnitudes[is_forward]
+        horizontal_pos += int(forward_magnitudes.sum())
+        vertical_pos += int(np.dot(clamped_sums[is_forward], forward_magnitudes))
+        aim = int(clamped_sums[-1])
+    return horizontal_pos, aim, vertical_pos
+
+
+def vectorized_course(opcodes: np.ndarray, magnitudes: np.ndarray, block_size=BLOCK_SIZE) -> Tuple[int, int]:
+    horizontal_pos, aim, vertical_pos = advance_course(opcodes, magnitudes, block_size=block_size)
+    return horizontal_pos * aim, horizontal_pos * vertical_pos
+
+
+def stream_course(path: str, block_size: int = READ_BLOCK_SIZE) -> Tuple[int, int]:
+    state = (0, 0, 0)
+    for block in read_blocks(path, block_size):
+        state = advance_course(*parse_columnar(block), state)
+    horizontal_pos, aim, vertical_pos = state
+    return horizontal_pos * aim, horizontal_pos * vertical_pos
+
+
+class CourseSummary:
+    """Effect of a run of commands on a submarine that starts it with any aim a >= 0.
+
+    The aim after the run is offset + max(a, -min_prefix) and the depth gained is
+    depth + horizontal * a + sum(weights * max(0, thresholds - a)).
+    """
+
+    def __init__(self, horizontal: int, offset: int, min_prefix: int, depth: int,
+                 thresholds: np.ndarray, weights: np.ndarray):
+        self.horizontal = horizontal
+        self.offset = offset
+        self.min_prefix = min_prefix
+        self.depth = depth
+        self.thresholds = thresholds
+        self.weights = weights
+        self.suffix_weights = None
+        self.suffix_moments = None
+
+    def merge(self, other: 'CourseSummary') -> 'CourseSummary':
+        # other starts with aim offset + max(a, e), which splits each of its terms max(0, t - aim)
+        # into max(0, t - offset - a) - max(0, e - a); terms with t - offset <= e never contribute
+        floor = -self.min_prefix
+        other_thresholds = other.thresholds - self.offset
+        is_active = other_thresholds > floor
+        other_weights = other.weights[is_active]
+        floor_weight = other.horizontal - int(other_weights.sum())
+        thresholds, weights = CourseSummary.__compact(
+            np.concatenate((self.thresholds, other_thresholds[is_active], [floor])),
+            np.concatenate((self.weights, other_weights, [floor_weight])))
+        return CourseSummary(self.horizontal + other.horizontal,
+                             self.offset + other.offset,
+                             min(self.min_prefix, self.offset + other.min_prefix),
+                             self.depth + other.depth + other.horizontal * self.offset,
+                             thresholds,
+                             weights)
+
+    def apply(self, aim: int) -> Tuple[int, int]:
+        if self.suffix_weights is None:
+            self.suffix_weights = np.cumsum(self.weights[::-1])[::-1]
+            self.suffix_moments = np.cumsum((self.weights * self.thresholds)[::-1])[::-1]
+        next_aim = self.offset + max(aim, -self.min_prefix)
+        depth = self.depth + self.horizontal * aim
+        index = bisect.bisect_right(self.thresholds, aim)
+        if index < len(self.thresholds):
+            depth += int(self.suffix_moments[index]) - aim * int(self.suffix_weights[index])
+        return next_aim, depth
+
+    def result(self) -> Tuple[int, int]:
+        aim = self.offset - self.min_prefix
+        depth = self.depth + int(np.dot(self.weights, self.thresholds))
+        return self.horizontal * aim, self.horizontal * depth
+
+    @staticmethod
+    def __compact(thresholds: np.ndarray, weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        thresholds, inverse = np.unique(thresholds.astype(np.int64), return_inverse=True)
+        total_weights = np.zeros(len(thresholds), dtype=np.int64)
+        np.add.at(total_weights, inverse, weights.astype(np.int64))
+        is_relevant = (thresholds > 0) & (total_weights != 0)
+        return thresholds[is_relevant], total_weights[is_relevant]
+
+    @classmethod
+    def empty(cls) -> 'CourseSummary':
+        return cls(0, 0, 0, 0, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+
+    @classmethod
+    def from_commands(cls, opcodes: np.ndarray, magnitudes: np.ndarray) -> 'CourseSummary':
+        if not len(opcodes):
+            return cls.empty()
+        magnitudes = magnitudes.astype(np.int64, copy=False)
+        is_forward = opcodes == Direction.FORWARD.value
+        deltas = np.where(opcodes == Direction.DOWN.value, magnitudes, 0) \
+                 - np.where(opcodes == Direction.UP.value, magnitudes, 0)
+        prefix_sums = np.cumsum(deltas)
+        min_prefix_sums = np.minimum(np.minimum.accumulate(prefix_sums), 0)
+
+        # with starting aim a, a forward command sees aim prefix_sum + a + max(0, -min_prefix_sum - a)
+        forward_magnitudes = magnitudes[is_forward]
+        thresholds, weights = cls.__compact(-min_prefix_sums[is_forward], forward_magnitudes)
+        return cls(int(forward_magnitudes.sum()),
+                   int(prefix_sums[-1]),
+                   int(min_prefix_sums[-1]),
+                   int(np.dot(prefix_sums[is_forward], forward_magnitudes)),
+                   thresholds,
+                   weights)
+
+
+def move(state: Tuple[int, int, int], opcode: int, magnitude: int) -> Tuple[int, int, int]:
+    horizontal_pos, vertical_pos, aim = state
+    if opcode == Direction.DOWN.value:
+        aim = aim + magnitude
+    elif opcode == Direction.UP.value:
+        aim = max(aim - magnitude, 0)
+    elif opcode == Direction.FORWARD.value:
+        horizontal_pos += magnitude
+        vertical_pos += aim * magnitude
+    return horizontal_pos, vertical_pos, aim
+
+
+class TrajectoryIndex:
+    """Commands grouped into blocks, with a segment tree of CourseSummary over the complete blocks.
+
+    levels[k][i] summarizes blocks [i * 2^k, (i + 1) * 2^k) and is added as soon as both of its
+    children exist, so appending never rebuilds the tree. States are (horizontal, depth, aim);
+    the depth of puzzle3 equals the aim.
+    """
+
+    def __init__(self, block_size: int = 64):
+        self.block_size = block_size
+        self.opcodes = array.array('B')
+        self.magnitudes = array.array('q')
+        self.levels = [[]]
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    def append(self, opcode: int, magnitude: int):
+        self.opcodes.append(opcode)
+        self.magnitudes.append(magnitude)
+        if len(self.opcodes) % self.block_size == 0:
+            self.__add_block(len(self.opcodes) // self.block_size - 1)
+
+    def extend(self, opcodes: Iterable[int], magnitudes: Iterable[int]):
+        for opcode, magnitude in zip(opcodes, magnitudes):
+            self.append(opcode, magnitude)
+
+    def run(self, begin: int, end: int, state: Tuple[int, int, int] = (0, 0, 0)) -> Tuple[int, int, int]:
+        if not 0 <= begin <= end <= len(self):
+            raise ValueError((begin, end))
+
+        # replay up to the first block boundary, jump over complete blocks, replay the rest
+        first_block = -(-begin // self.block_size)
+        last_block = min(end // self.block_size, len(self.levels[0]))
+        if first_block >= last_block:
+            return self.__replay(begin, end, state)
+
+        state = self.__replay(begin, first_block * self.block_size, state)
+        block = first_block
+        while block < last_block:
+            level = 0
+            while block % (2 << level) == 0 and block + (2 << level) <= last_block \
+                    and (block >> (level + 1)) < len(self.levels[level + 1]):
+                level += 1
+            summary = self.levels[level][block >> level]
+            horizontal_pos, vertical_pos, aim = state
+            next_aim, depth = summary.apply(aim)
+            state = horizontal_pos + summary.horizontal, vertical_pos + depth, next_aim
+            block += 1 << level
+        return self.__replay(last_block * self.block_size, end, state)
+
+    def position_at(self, step: int) -> Tuple[int, int, int]:
+        return self.run(0, step)
+
+    def __replay(self, begin: int, end: int, state: Tuple[int, int, int]) -> Tuple[int, int, int]:
+        for index in range(begin, end):
+            state = move(state, self.opcodes[index], self.magnitudes[index])
+        return state
+
+    def __add_block(self, block: int):
+        begin = block * self.block_size
+        opcodes = np.frombuffer(self.opcodes, dtype=np.uint8)[begin:begin + self.block_size]
+        magnitudes = np.frombuffer(self.magnitudes, dtype=np.int64)[begin:begin + self.block_size]
+        self.levels[0].append(CourseSummary.from_commands(opcodes, magnitudes))
+
+        level, index = 0, block
+        while index % 2 == 1:
+            if len(self.levels) == level + 1:
+                self.levels.append([])
+            left, right = self.levels[level][index - 1], self.levels[level][index]
+            self.levels[level + 1].append(left.merge(right))
+            level, index = level + 1, index // 2
+
+    @classmethod
+    def from_commands(cls, opcodes: Iterable[int], magnitudes: Iterable[int], block_size: int = 64):
+        index = cls(block_size)
+        index.extend(opcodes, magnitudes)
+        return index
+
+
+def read_chunk(path: str, begin: int, end: int) -> np.ndarray:
+    # a line belongs to the chunk in which its first byte lies
+    with open(path, 'rb') as input:
+        if begin > 0:
+            input.seek(begin - 1)
+            input.readline()
+        position = input.tell()
+        if position >= end:
+            return np.empty(0, dtype=np.uint8)
+        data = input.read(end - position)
+        if data and not data.endswith(b'\n'):
+            data += input.readline()
+    return np.frombuffer(data, dtype=np.uint8)
+
+
+def summarize_chunk(task: Tuple[str, int, int]) -> CourseSummary:
+    return CourseSummary.from_commands(*parse_columnar(read_chunk(*task)))
+
+
+def parallel_course(path: str, num_workers: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[int, int]:
+    num_workers = num_workers or os.cpu_count()
+    file_size = os.path.getsize(path)
+    num_chunks = max(num_workers, -(-file_size // chunk_size), 1)
+    boundaries = [file_size * index // num_chunks for index in range(0, num_chunks + 1)]
+    with multiprocessing.Pool(num_workers) as pool:
+        summaries = pool.imap(summarize_chunk, [(path, begin, end) for begin, end in zip(boundaries, boundaries[1:])])
+        return functools.reduce(CourseSummary.merge, summaries, CourseSummary.empty()).result()
+
+
+def write_random_commands(path: str, num_commands: int, block_size: int = 1 << 20):
+    random_state = np.random.default_rng(0)
+    lines = [f'{name} {magnitude}\n'.encode() for name in STR_TO_DIRECTION for magnitude in range(1, 10)]
+    with open(path, 'wb') as output:
+        for begin in range(0, num_commands, block_size):
+            line_indices = random_state.integers(0, len(lines), size=min(block_size, num_commands - begin))
+            output.write(b''.join([lines[index] for index in line_indices.tolist()]))
+
+
+def benchmark_vectorized(num_commands: int):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, 'commands.txt')
+        write_random_commands(path, num_commands)
+        start_time = time.perf_counter()
+        result = stream_course(path)
+        elapsed_time = time.perf_counter() - start_time
+    peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f'commands: {num_commands}, load and solve time: {elapsed_time:.3f}s, '
+          f'peak rss: {peak_memory / 1024:.0f} MiB, result: {result}')
 
 
 if __name__ == '__main__':
-    puzzle4()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--vectorized', metavar='PATH', help='solve both puzzles with the columnar engine')
+    parser.add_argument('--parallel', metavar='PATH', help='solve both puzzles with worker processes')
+    parser.add_argument('--workers', metavar='N', type=int, help='number of worker processes')
+    parser.add_argument('--position', metavar='T', type=int, action='append',
+                        help='print horizontal position, depth and aim after T commands')
+    parser.add_argument('--benchmark', metavar='N', type=int, help='time loading and solving N random commands')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark_vectorized(args.benchmark)
+    elif args.position:
+        trajectory_index = TrajectoryIndex.from_commands(*load_columnar_input(args.vectorized or 'input.txt'))
+        for step in args.position:
+            print(step, *trajectory_index.position_at(step))
+    elif args.parallel:
+        for result in parallel_course(args.parallel, args.workers):
+            print(result)
+    elif args.vectorized:
+        for result in stream_course(args.vectorized):
+            print(result)
+    else:
+        movements = load_input()
+        print(puzzle3(movements))
+        print(puzzle4(movements))
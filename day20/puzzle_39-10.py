@@ -128,17 +128,26 @@ def read_test_input():
     # .enhance(algorithm).lit_pixels())
 
 
-def read_file_input():
+def load_file_input():
     with open('input.txt', 'r') as input_stream:
         lines = [line.rstrip() for line in input_stream.readlines()]
         algorithm = Algorithm(lines[0])
         image_matrix = [list(line) for line in lines[2:]]
-        image = Image(image_matrix)
-        current_image = image
-        for _ in range(50):
-            current_image = current_image.enhance(algorithm)
-        print(current_image)
-        print(current_image.lit_pixels())
+        return algorithm, Image(image_matrix)
+
+
+def enhance_image(algorithm: Algorithm, image: Image, num_steps: int) -> Image:
+    current_image = image
+    for _ in range(num_steps):
+        current_image = current_image.enhance(algorithm)
+    return current_image
+
+
+def read_file_input():
+    algorithm, image = load_file_input()
+    current_image = enhance_image(algorithm, image, 50)
+    print(current_image)
+    print(current_image.lit_pixels())
 
 
 if __name__ == '__main__':
@@ -1,5 +1,18 @@
+import argparse
+import functools
+import itertools
+import json
+import multiprocessing
 import operator
+import os
+import sys
 from collections import Counter
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+WORD_SIZE = 64
+BATCH_SIZE = 1 << 16
 
 
 def load_input():
@@ -27,8 +40,7 @@ def load_test_input():
             [0, 1, 0, 1, 0]]
 
 
-def puzzle_5():
-    values = load_input()
+def puzzle_5(values):
     num_positions = len(values[0])
     counters = []
     for position in range(0, num_positions):
@@ -49,7 +61,7 @@ def puzzle_5():
         epsilon <<= 1
         epsilon += least_common_value
 
-    print(gamma * epsilon)
+    return gamma * epsilon
 
 
 def row_to_bin(row):
@@ -80,8 +92,223 @@ def filter_value(values, filter_criteria, tie_breaker):
     return row_to_bin(filtered_values[0])
 
 
+class PackedReports:
+    """Diagnostic reports stored as unsigned integers, one row of words per report.
+
+    Bit q counted from the least significant end lives in word q // WORD_SIZE at shift q % WORD_SIZE.
+    Reports of up to 64 bits take a single word of the narrowest fitting dtype.
+    """
+
+    def __init__(self, words: np.ndarray, width: int):
+        self.words = words
+        self.width = width
+
+    def __len__(self):
+        return len(self.words)
+
+    def get_column(self, position: int) -> np.ndarray:
+        bit = self.width - 1 - position
+        word, shift = divmod(bit, WORD_SIZE)
+        column = self.words[:, word]
+        return (column >> column.dtype.type(shift)) & column.dtype.type(1)
+
+    def column_counts(self) -> np.ndarray:
+        return np.array([np.count_nonzero(self.get_column(position)) for position in range(0, self.width)],
+                        dtype=np.int64)
+
+    def gamma_epsilon(self) -> Tuple[int, int]:
+        counts = self.column_counts()
+        num_reports = len(self)
+        gamma = 0
+        for position, ones in enumerate(counts.tolist()):
+            zeros = num_reports - ones
+            # Counter.most_common prefers the value seen first when both are equally common
+            most_common_value = 1 if ones > zeros else 0 if ones < zeros else int(self.get_column(position)[0])
+            gamma = (gamma << 1) | most_common_value
+        return gamma, ((1 << self.width) - 1) ^ gamma
+
+    def sorted(self) -> 'PackedReports':
+        # np.lexsort takes its primary key last, which is the most significant word
+        return PackedReports(self.words[np.lexsort(self.words.T)], self.width)
+
+    def to_int(self, index: int) -> int:
+        value = 0
+        for word in reversed(self.words[index].tolist()):
+            value = (value << WORD_SIZE) | word
+        return value
+
+    @staticmethod
+    def get_dtype(width: int):
+        for dtype in [np.uint8, np.uint16, np.uint32]:
+            if width <= np.iinfo(dtype).bits:
+                return dtype
+        return np.uint64
+
+    @classmethod
+    def from_bits(cls, bits: np.ndarray) -> 'PackedReports':
+        num_reports, width = bits.shape
+        dtype = cls.get_dtype(width)
+        num_words = max(-(-width // WORD_SIZE), 1)
+        words = np.zeros((num_reports, num_words), dtype=dtype)
+        for word in range(0, num_words):
+            end = width - word * WORD_SIZE
+            begin = max(end - WORD_SIZE, 0)
+            for column in range(begin, end):
+                words[:, word] <<= dtype(1)
+                words[:, word] |= bits[:, column].astype(dtype)
+        return cls(words, width)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str]) -> 'PackedReports':
+        rows = [line.rstrip() for line in lines]
+        rows = [row for row in rows if row]
+        buffer = np.frombuffer(''.join(rows).encode('ascii'), dtype=np.uint8)
+        width = len(rows[0]) if rows else 0
+        if any(len(row) != width for row in rows):
+            raise ValueError('reports have different widths')
+        return cls.from_bits((buffer - ord('0')).reshape(len(rows), width))
+
+    @classmethod
+    def load(cls, path='input.txt') -> 'PackedReports':
+        with open(path, 'r') as input:
+            return cls.from_lines(input)
+
+
+def packed_puzzle_5(reports: PackedReports):
+    gamma, epsilon = reports.gamma_epsilon()
+    return gamma * epsilon
+
+
+class BitCounter:
+    """Per-position counts of set bits that can be fed incrementally and merged.
+
+    The first report seen is kept to break ties the way Counter.most_common does, so merging is
+    order-sensitive only in that respect: the left operand is treated as the earlier data.
+    """
+
+    def __init__(self, width: int = 0, num_reports: int = 0, ones: Optional[List[int]] = None,
+                 first_report: Optional[int] = None):
+        self.width = width
+        self.num_reports = num_reports
+        self.ones = ones if ones is not None else [0] * width
+        self.first_report = first_report
+
+    def add_reports(self, reports: PackedReports):
+        if not len(reports):
+            return
+        if not self.num_reports:
+            self.width = reports.width
+            self.ones = [0] * reports.width
+            self.first_report = reports.to_int(0)
+        elif reports.width != self.width:
+            raise ValueError(reports.width)
+        self.num_reports += len(reports)
+        self.ones = [total + count for total, count in zip(self.ones, reports.column_counts().tolist())]
+
+    def update(self, lines: Iterable[str], batch_size: int = BATCH_SIZE) -> 'BitCounter':
+        lines = iter(lines)
+        while True:
+            batch = list(itertools.islice(lines, batch_size))
+            if not batch:
+                return self
+            self.add_reports(PackedReports.from_lines(batch))
+
+    def merge(self, other: 'BitCounter') -> 'BitCounter':
+        if not self.num_reports:
+            return BitCounter(other.width, other.num_reports, list(other.ones), other.first_report)
+        if not other.num_reports:
+            return BitCounter(self.width, self.num_reports, list(self.ones), self.first_report)
+        if self.width != other.width:
+            raise ValueError(other.width)
+        return BitCounter(self.width, self.num_reports + other.num_reports,
+                          [left + right for left, right in zip(self.ones, other.ones)], self.first_report)
+
+    def gamma_epsilon(self) -> Tuple[int, int]:
+        gamma = 0
+        for position, ones in enumerate(self.ones):
+            zeros = self.num_reports - ones
+            if ones == zeros:
+                most_common_value = (self.first_report >> (self.width - 1 - position)) & 1
+            else:
+                most_common_value = 1 if ones > zeros else 0
+            gamma = (gamma << 1) | most_common_value
+        return gamma, ((1 << self.width) - 1) ^ gamma
+
+    def to_dict(self) -> dict:
+        return {'width': self.width, 'num_reports': self.num_reports, 'ones': self.ones,
+                'first_report': self.first_report}
+
+    def save(self, path: str):
+        with open(path, 'w') as output:
+            json.dump(self.to_dict(), output)
+
+    @classmethod
+    def from_dict(cls, state: dict) -> 'BitCounter':
+        return cls(state['width'], state['num_reports'], state['ones'], state['first_report'])
+
+    @classmethod
+    def load(cls, path: str) -> 'BitCounter':
+        with open(path, 'r') as input:
+            return cls.from_dict(json.load(input))
+
+
+def count_file(path: str) -> BitCounter:
+    with open(path, 'r') as input:
+        return BitCounter().update(input)
+
+
+def count_files(paths: List[str], num_workers: int = None) -> BitCounter:
+    with multiprocessing.Pool(num_workers) as pool:
+        return functools.reduce(BitCounter.merge, pool.imap(count_file, paths), BitCounter())
+
+
+def sorted_filter_value(sorted_reports: PackedReports, filter_criteria, tie_breaker):
+    # reports that agree on the bits considered so far form a contiguous range of the sorted order,
+    # within which the reports with the current bit unset precede those with it set
+    begin, end = 0, len(sorted_reports)
+    for position in range(0, sorted_reports.width):
+        if end - begin <= 1:
+            break
+        word, shift = divmod(sorted_reports.width - 1 - position, WORD_SIZE)
+        column = sorted_reports.words[begin:end, word]
+        lower_bound = ((int(column[0]) >> shift) | 1) << shift
+        split = begin + int(np.searchsorted(column, column.dtype.type(lower_bound)))
+
+        counter = Counter({bit: count for bit, count in [(0, split - begin), (1, end - split)] if count})
+        if counter[0] == counter[1]:
+            bit = tie_breaker
+        else:
+            bit = filter_criteria(counter, key=counter.get)
+        begin, end = (begin, split) if bit == 0 else (split, end)
+    return sorted_reports.to_int(begin)
+
+
+def life_support_ratings(reports: PackedReports) -> Tuple[int, int]:
+    sorted_reports = reports.sorted()
+    return sorted_filter_value(sorted_reports, max, 1), sorted_filter_value(sorted_reports, min, 0)
+
+
 if __name__ == '__main__':
-    values = load_input()
-    oxygen_gen = filter_value(values, max, 1)
-    co2_scrubber = filter_value(values, min, 0)
-    print(oxygen_gen, co2_scrubber, oxygen_gen * co2_scrubber)
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', metavar='PATH', nargs='+', help='stream reports from PATH, or - for stdin')
+    parser.add_argument('--state', metavar='PATH', help='counter state to extend with the counted files')
+    parser.add_argument('--workers', metavar='N', type=int, help='number of worker processes')
+    args = parser.parse_args()
+
+    if args.count:
+        counter = BitCounter.load(args.state) if args.state and os.path.exists(args.state) else BitCounter()
+        files = [path for path in args.count if path != '-']
+        if files:
+            counter = counter.merge(count_files(files, args.workers))
+        if '-' in args.count:
+            counter.update(sys.stdin)
+        if args.state:
+            counter.save(args.state)
+        gamma, epsilon = counter.gamma_epsilon()
+        print(gamma, epsilon, gamma * epsilon)
+    else:
+        values = load_input()
+        print(puzzle_5(values))
+        oxygen_gen = filter_value(values, max, 1)
+        co2_scrubber = filter_value(values, min, 0)
+        print(oxygen_gen, co2_scrubber, oxygen_gen * co2_scrubber)
@@ -1,5 +1,11 @@
+import argparse
+import random
 import re
 import sys
+from collections import defaultdict
+from typing import List, Tuple
+
+import numpy as np
 
 WHITESPACE_PATTERN = re.compile(r'\s+')
 COMMA_PATTERN = re.compile(r'[,]')
@@ -56,7 +62,137 @@ class Board:
         return unmarked
 
 
-def load_input():
+class BitBoard:
+    """Board with the marks kept as bits of an integer, bit row * size + column per tile."""
+
+    __slots__ = ['numbers', 'win_masks', 'marked']
+
+    WIN_MASKS = {}
+
+    def __init__(self, numbers):
+        self.numbers = tuple(number for row in numbers for number in row)
+        self.win_masks = BitBoard.get_win_masks(len(numbers))
+        self.marked = 0
+
+    def mark(self, number):
+        if number not in self.numbers:
+            return
+        position = self.numbers.index(number)
+        while True:
+            self.marked |= 1 << position
+            try:
+                position = self.numbers.index(number, position + 1)
+            except ValueError:
+                return
+
+    def is_winner(self):
+        marked = self.marked
+        for mask in self.win_masks:
+            if marked & mask == mask:
+                return True
+        return False
+
+    def sum_unmarked(self):
+        unmarked = 0
+        unmarked_bits = ~self.marked & ((1 << len(self.numbers)) - 1)
+        while unmarked_bits:
+            lowest_bit = unmarked_bits & -unmarked_bits
+            unmarked += self.numbers[lowest_bit.bit_length() - 1]
+            unmarked_bits ^= lowest_bit
+        return unmarked
+
+    @classmethod
+    def get_win_masks(cls, board_size: int) -> Tuple[int, ...]:
+        if board_size not in cls.WIN_MASKS:
+            row_mask = (1 << board_size) - 1
+            column_mask = sum(1 << (row * board_size) for row in range(0, board_size))
+            cls.WIN_MASKS[board_size] = tuple([row_mask << (row * board_size) for row in range(0, board_size)]
+                                              + [column_mask << column for column in range(0, board_size)])
+        return cls.WIN_MASKS[board_size]
+
+
+class BingoEngine:
+    """Plays all boards at once using an index from number to the tiles that hold it.
+
+    A draw only touches the boards containing the number and updates their row and column hit
+    counters, so a win is detected when a counter reaches the board size.
+    """
+
+    def __init__(self, boards: List[List[List[int]]]):
+        self.positions = defaultdict(list)
+        self.row_hits = []
+        self.column_hits = []
+        self.unmarked_sums = []
+        self.board_sizes = []
+        self.has_won = [False] * len(boards)
+        self.num_active = len(boards)
+        self.drawn = set()
+        for board_number, board in enumerate(boards):
+            for row_number, row in enumerate(board):
+                for column_number, number in enumerate(row):
+                    self.positions[number].append((board_number, row_number, column_number))
+            self.row_hits.append([0] * len(board))
+            self.column_hits.append([0] * len(board[0]))
+            self.unmarked_sums.append(sum(sum(row) for row in board))
+            self.board_sizes.append((len(board), len(board[0])))
+
+    def draw(self, number: int) -> List[int]:
+        """Returns the boards that win on the number in ascending board order."""
+        if number in self.drawn:
+            return []
+        self.drawn.add(number)
+
+        # the tiles of a board are contiguous in the index and all of them are marked before the win
+        # check, so a board holding the number twice loses both from its unmarked sum
+        winners = []
+        for board_number, row_number, column_number in self.positions.get(number, []):
+            if self.has_won[board_number]:
+                continue
+            self.unmarked_sums[board_number] -= number
+            row_hits, column_hits = self.row_hits[board_number], self.column_hits[board_number]
+            row_hits[row_number] += 1
+            column_hits[column_number] += 1
+            num_rows, num_columns = self.board_sizes[board_number]
+            if row_hits[row_number] == num_columns or column_hits[column_number] == num_rows:
+                if not winners or winners[-1] != board_number:
+                    winners.append(board_number)
+        for board_number in winners:
+            self.has_won[board_number] = True
+        self.num_active -= len(winners)
+        return winners
+
+    def play(self, bingo_numbers: List[int]) -> List[Tuple[int, int]]:
+        """Returns (board number, score) of every board in the order the boards win.
+
+        Boards winning on the same draw are listed in ascending board order.
+        """
+        results = []
+        for bingo_number in bingo_numbers:
+            for board_number in self.draw(bingo_number):
+                results.append((board_number, self.unmarked_sums[board_number] * bingo_number))
+            if not self.num_active:
+                break
+        return results
+
+    def first_and_last_winner(self, bingo_numbers: List[int]) -> Tuple[int, int]:
+        # among the boards winning on the same draw, the lowest numbered one is reported as in the draw loop
+        first_score, last_score = None, None
+        for bingo_number in bingo_numbers:
+            winners = self.draw(bingo_number)
+            if winners:
+                last_score = self.unmarked_sums[winners[0]] * bingo_number
+                if first_score is None:
+                    first_score = last_score
+            if not self.num_active:
+                break
+        return first_score, last_score
+
+    @classmethod
+    def from_boards(cls, boards: List[Board]) -> 'BingoEngine':
+        return cls([[[tile.number for tile in row] for row in board.rows] for board in boards])
+
+
+def load_input(board_class=Board):
     with open('input.txt', 'r') as input:
         raw_values = input.readlines()
 
@@ -69,28 +205,121 @@ def load_input():
     for row_index in range(2, len(raw_values)):
         line = raw_values[row_index].rstrip()
         if not line:
-            boards.append(Board(raw_board))
+            boards.append(board_class(raw_board))
             raw_board = []
             continue
         numbers = parse_numbers(line, WHITESPACE_PATTERN)
         raw_board.append(numbers)
     if raw_board:
-        boards.append(Board(raw_board))
+        boards.append(board_class(raw_board))
 
     return bingo_numbers, boards
 
 
-if __name__ == '__main__':
-    bingo_numbers, boards = load_input()
+def load_array_input(path='input.txt') -> Tuple[np.ndarray, np.ndarray]:
+    with open(path, 'r') as input:
+        bingo_numbers = np.array(parse_numbers(input.readline().rstrip(), COMMA_PATTERN), dtype=np.int64)
+        raw_boards = input.read()
+    # the first board ends at the first blank line after its rows, whatever the line endings are
+    board_size = 0
+    for line in raw_boards.splitlines():
+        if line.strip():
+            board_size += 1
+        elif board_size:
+            break
+    numbers = np.array(raw_boards.split(), dtype=np.int64)
+    return bingo_numbers, numbers.reshape(-1, board_size, board_size)
+
+
+def evaluate_boards(bingo_numbers: np.ndarray, boards: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the draw index at which every board wins and its score.
+
+    Boards that never win get the draw index len(bingo_numbers) and score 0.
+    """
+    num_draws = len(bingo_numbers)
+    max_number = max(int(bingo_numbers.max(initial=0)), int(boards.max(initial=0)))
+    draw_ranks = np.full(max_number + 1, num_draws, dtype=np.int64)
+    # assigned in reverse so that a number drawn twice keeps its first draw index
+    draw_ranks[bingo_numbers[::-1]] = np.arange(num_draws - 1, -1, -1)
+
+    board_ranks = draw_ranks[boards]
+    row_wins = board_ranks.max(axis=2).min(axis=1)
+    column_wins = board_ranks.max(axis=1).min(axis=1)
+    win_turns = np.minimum(row_wins, column_wins)
+
+    has_won = win_turns < num_draws
+    unmarked_sums = np.where(board_ranks > win_turns[:, None, None], boards, 0).sum(axis=(1, 2))
+    winning_numbers = np.where(has_won, bingo_numbers[np.minimum(win_turns, num_draws - 1)], 0)
+    return win_turns, unmarked_sums * winning_numbers
+
+
+def first_winner(bingo_numbers: List[int], boards: List[Board]) -> int:
+    for bingo_number in bingo_numbers:
+        for board in boards:
+            board.mark(bingo_number)
+            if board.is_winner():
+                return board.sum_unmarked() * bingo_number
+    return None
+
 
+def last_winner(bingo_numbers: List[int], boards: List[Board]) -> int:
     current_round = boards
     for bingo_number in bingo_numbers:
         next_round = []
-        for board in boards:
+        for board in current_round:
             board.mark(bingo_number)
             if not board.is_winner():
                 next_round.append(board)
         if not next_round:
-            print(current_round[0].sum_unmarked() * bingo_number)
-            break
+            return current_round[0].sum_unmarked() * bingo_number
         current_round = next_round
+    return None
+
+
+def check_indexed(num_games: int, num_boards: int = 5, max_number: int = 30, seed: int = 0) -> int:
+    """Compares BingoEngine with the draw loop on random games and returns the number of mismatches.
+
+    The numbers come from a small range and may repeat within a board, so several boards often win
+    on the same draw and some boards mark two tiles at once.
+    """
+    random_state = random.Random(seed)
+    num_mismatches = 0
+    for game in range(0, num_games):
+        bingo_numbers = random_state.sample(range(0, max_number), max_number)
+        raw_boards = [[[random_state.randrange(0, max_number) for _ in range(0, 5)] for _ in range(0, 5)]
+                      for _ in range(0, num_boards)]
+        expected = (first_winner(bingo_numbers, [Board(raw_board) for raw_board in raw_boards]),
+                    last_winner(bingo_numbers, [Board(raw_board) for raw_board in raw_boards]))
+        actual = BingoEngine(raw_boards).first_and_last_winner(bingo_numbers)
+        if actual != expected:
+            num_mismatches += 1
+            print(f'game: {game}, expected: {expected}, indexed: {actual}')
+    return num_mismatches
+
+
+def first_and_last_winner(bingo_numbers: np.ndarray, boards: np.ndarray) -> Tuple[int, int]:
+    win_turns, scores = evaluate_boards(bingo_numbers, boards)
+    playing_turns = np.where(win_turns < len(bingo_numbers), win_turns, -1)
+    return int(scores[np.argmin(win_turns)]), int(scores[np.argmax(playing_turns)])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--indexed', action='store_true', help='print the first and last winner using BingoEngine')
+    parser.add_argument('--check', metavar='N', type=int, help='compare --indexed with the draw loop on N random games')
+    parser.add_argument('--bitmask', action='store_true', help='play the boards as BitBoard instances')
+    parser.add_argument('--vectorized', action='store_true', help='print the first and last winner from draw ranks')
+    args = parser.parse_args()
+
+    if args.check:
+        print(check_indexed(args.check))
+    elif args.vectorized:
+        for score in first_and_last_winner(*load_array_input()):
+            print(score)
+    else:
+        bingo_numbers, boards = load_input(BitBoard if args.bitmask else Board)
+        if args.indexed:
+            for score in BingoEngine.from_boards(boards).first_and_last_winner(bingo_numbers):
+                print(score)
+        else:
+            print(last_winner(bingo_numbers, boards))
@@ -1,9 +1,20 @@
+import argparse
+import bisect
+import itertools
+import math
+import operator
+import random
 import re
 import logging
-from collections import Counter
-from typing import Tuple, List
+import time
+from collections import Counter, defaultdict
+from typing import Iterator, Optional, Tuple, List
+
+import numpy as np
 
 LINE_PATTERN = re.compile(r'(?P<x1>\d+),(?P<y1>\d+)\s+->\s+(?P<x2>\d+),(?P<y2>\d+)')
+# a Counter entry costs around a hundred bytes per point, a grid cell at most four
+DENSE_AREA_PER_POINT = 32
 
 
 class LineSegment:
@@ -30,6 +41,63 @@ class LineSegment:
                 points.append((int(x), int(y)))
         return points
 
+    def iter_grid_points(self) -> Iterator[Tuple[int, int]]:
+        x1, y1 = self.p1
+        x2, y2 = self.p2
+        delta_x, delta_y = x2 - x1, y2 - y1
+        num_steps = math.gcd(delta_x, delta_y)
+        if num_steps == 0:
+            yield x1, y1
+            return
+
+        step_x, step_y = delta_x // num_steps, delta_y // num_steps
+        for step in range(0, num_steps + 1):
+            yield x1 + step * step_x, y1 + step * step_y
+
+    def clip(self, min_x: int, min_y: int, max_x: int, max_y: int) -> Optional[Tuple[int, int]]:
+        """Returns the range of steps t for which p1 + t * step lies inside the rectangle."""
+        x1, y1 = self.p1
+        x2, y2 = self.p2
+        num_steps = math.gcd(x2 - x1, y2 - y1)
+        begin, end = 0, num_steps
+        for start, stop, low, high in [(x1, x2, min_x, max_x), (y1, y2, min_y, max_y)]:
+            step = (stop - start) // num_steps if num_steps else 0
+            if step == 0:
+                if not low <= start <= high:
+                    return None
+                continue
+            if step < 0:
+                start, step, low, high = -start, -step, -high, -low
+            begin = max(begin, -((start - low) // step))
+            end = min(end, (high - start) // step)
+        if begin > end:
+            return None
+        return begin, end
+
+    def get_step(self) -> Tuple[int, int]:
+        x1, y1 = self.p1
+        x2, y2 = self.p2
+        num_steps = math.gcd(x2 - x1, y2 - y1)
+        if num_steps == 0:
+            return 0, 0
+        return (x2 - x1) // num_steps, (y2 - y1) // num_steps
+
+    def get_direction(self) -> Tuple[int, int]:
+        x1, y1 = self.p1
+        x2, y2 = self.p2
+        num_steps = math.gcd(x2 - x1, y2 - y1)
+        if num_steps == 0:
+            return 1, 0
+        step_x, step_y = (x2 - x1) // num_steps, (y2 - y1) // num_steps
+        if step_x < 0 or (step_x == 0 and step_y < 0):
+            return -step_x, -step_y
+        return step_x, step_y
+
+    def num_grid_points(self) -> int:
+        x1, y1 = self.p1
+        x2, y2 = self.p2
+        return math.gcd(x2 - x1, y2 - y1) + 1
+
     def is_vertical(self) -> bool:
         return self.p1[0] == self.p2[0]
 
@@ -55,8 +123,7 @@ def puzzle9(line_segments: List[LineSegment]) -> int:
     counter = Counter()
     for line_segment in line_segments:
         if line_segment.is_horizontal() or line_segment.is_vertical():
-            points = line_segment.get_grid_points()
-            for point in points:
+            for point in line_segment.iter_grid_points():
                 counter[point] += 1
 
     total_points = 0
@@ -69,8 +136,7 @@ def puzzle9(line_segments: List[LineSegment]) -> int:
 def puzzle10(line_segments: List[LineSegment]) -> int:
     counter = Counter()
     for line_segment in line_segments:
-        points = line_segment.get_grid_points()
-        for point in points:
+        for point in line_segment.iter_grid_points():
             counter[point] += 1
 
     total_points = 0
@@ -80,6 +146,278 @@ def puzzle10(line_segments: List[LineSegment]) -> int:
     return total_points
 
 
+def dense_count_overlaps(line_segments: List[LineSegment]) -> int:
+    if not line_segments:
+        return 0
+    min_x = min(min(line_segment.p1[0], line_segment.p2[0]) for line_segment in line_segments)
+    max_x = max(max(line_segment.p1[0], line_segment.p2[0]) for line_segment in line_segments)
+    min_y = min(min(line_segment.p1[1], line_segment.p2[1]) for line_segment in line_segments)
+    max_y = max(max(line_segment.p1[1], line_segment.p2[1]) for line_segment in line_segments)
+    width = max_x - min_x + 1
+    dtype = np.uint8 if len(line_segments) < 255 else np.uint16 if len(line_segments) < 65535 else np.uint32
+    grid = np.zeros((max_y - min_y + 1) * width, dtype=dtype)
+
+    # the points of a segment are equally spaced in the flattened grid, so each one is a strided slice
+    for line_segment in line_segments:
+        begin = (line_segment.p1[1] - min_y) * width + line_segment.p1[0] - min_x
+        end = (line_segment.p2[1] - min_y) * width + line_segment.p2[0] - min_x
+        begin, end = (begin, end) if begin <= end else (end, begin)
+        num_steps = line_segment.num_grid_points() - 1
+        stride = (end - begin) // num_steps if num_steps else 1
+        grid[begin:end + 1:stride] += 1
+    return int(np.count_nonzero(grid > 1))
+
+
+def count_overlaps(line_segments: List[LineSegment], include_diagonals: bool = True) -> int:
+    if not include_diagonals:
+        line_segments = [line_segment for line_segment in line_segments
+                         if line_segment.is_horizontal() or line_segment.is_vertical()]
+    if not line_segments:
+        return 0
+
+    num_points = sum(line_segment.num_grid_points() for line_segment in line_segments)
+    width = max(max(line_segment.p1[0], line_segment.p2[0]) for line_segment in line_segments) \
+            - min(min(line_segment.p1[0], line_segment.p2[0]) for line_segment in line_segments) + 1
+    height = max(max(line_segment.p1[1], line_segment.p2[1]) for line_segment in line_segments) \
+             - min(min(line_segment.p1[1], line_segment.p2[1]) for line_segment in line_segments) + 1
+    if width * height <= DENSE_AREA_PER_POINT * num_points:
+        return dense_count_overlaps(line_segments)
+    return puzzle10(line_segments)
+
+
+class LineCoverage:
+    """Coverage of one lattice line b * x - a * y = constant with direction (a, b).
+
+    A point of the line is identified by u = a * x + b * y, which grows by a^2 + b^2 per grid step.
+    Ranges of u covered by at least one and at least two segments are kept as half-open intervals.
+    """
+
+    def __init__(self, direction: Tuple[int, int], constant: int, intervals: List[Tuple[int, int]]):
+        self.direction = direction
+        self.constant = constant
+        step_x, step_y = direction
+        self.step = step_x * step_x + step_y * step_y
+
+        events = sorted([(begin, 1) for begin, _ in intervals] + [(end + self.step, -1) for _, end in intervals])
+        self.covered, self.multiple = [], []
+        depth, covered_begin, multiple_begin = 0, None, None
+        for position, group in itertools.groupby(events, key=operator.itemgetter(0)):
+            next_depth = depth + sum(delta for _, delta in group)
+            if depth < 1 <= next_depth:
+                covered_begin = position
+            elif next_depth < 1 <= depth:
+                self.covered.append((covered_begin, position))
+            if depth < 2 <= next_depth:
+                multiple_begin = position
+            elif next_depth < 2 <= depth:
+                self.multiple.append((multiple_begin, position))
+            depth = next_depth
+        self.covered_begins = [begin for begin, _ in self.covered]
+        self.multiple_begins = [begin for begin, _ in self.multiple]
+
+    def get_point(self, position: int) -> Tuple[int, int]:
+        step_x, step_y = self.direction
+        return ((step_y * self.constant + step_x * position) // self.step,
+                (step_y * position - step_x * self.constant) // self.step)
+
+    def get_position(self, point: Tuple[int, int]) -> int:
+        step_x, step_y = self.direction
+        return step_x * point[0] + step_y * point[1]
+
+    def is_covered(self, point: Tuple[int, int]) -> bool:
+        return LineCoverage.__contains(self.covered, self.covered_begins, self.get_position(point))
+
+    def is_multiple(self, point: Tuple[int, int]) -> bool:
+        return LineCoverage.__contains(self.multiple, self.multiple_begins, self.get_position(point))
+
+    def num_multiple(self) -> int:
+        return sum((end - begin) // self.step for begin, end in self.multiple)
+
+    @staticmethod
+    def __contains(intervals, begins, position) -> bool:
+        index = bisect.bisect_right(begins, position) - 1
+        return index >= 0 and position < intervals[index][1]
+
+    @staticmethod
+    def get_constant(direction: Tuple[int, int], point: Tuple[int, int]) -> int:
+        step_x, step_y = direction
+        return step_y * point[0] - step_x * point[1]
+
+
+def sweep_count_overlaps(line_segments: List[LineSegment], include_diagonals: bool = True) -> int:
+    intervals = defaultdict(list)
+    for line_segment in line_segments:
+        if not include_diagonals and not (line_segment.is_horizontal() or line_segment.is_vertical()):
+            continue
+        step_x, step_y = direction = line_segment.get_direction()
+        begin = step_x * line_segment.p1[0] + step_y * line_segment.p1[1]
+        end = step_x * line_segment.p2[0] + step_y * line_segment.p2[1]
+        key = direction, LineCoverage.get_constant(direction, line_segment.p1)
+        intervals[key].append((min(begin, end), max(begin, end)))
+
+    lines = defaultdict(dict)
+    for (direction, constant), line_intervals in intervals.items():
+        lines[direction][constant] = LineCoverage(direction, constant, line_intervals)
+    total_points = sum(line.num_multiple() for direction_lines in lines.values() for line in direction_lines.values())
+
+    # the constant of a line with another direction changes linearly along a covered range, so the
+    # lines it can cross form a contiguous run of the sorted constants
+    crossings = set()
+    directions = list(lines)
+    for index, direction in enumerate(directions):
+        step_x, step_y = direction
+        constants = sorted(lines[direction])
+        for other_direction in directions[index + 1:]:
+            other_step_x, other_step_y = other_direction
+            determinant = step_x * other_step_y - other_step_x * step_y
+            for other_line in lines[other_direction].values():
+                for begin, end in other_line.covered:
+                    first_constant = LineCoverage.get_constant(direction, other_line.get_point(begin))
+                    last_constant = LineCoverage.get_constant(direction, other_line.get_point(end - other_line.step))
+                    low, high = min(first_constant, last_constant), max(first_constant, last_constant)
+                    for constant in constants[bisect.bisect_left(constants, low):bisect.bisect_right(constants, high)]:
+                        x, x_remainder = divmod(step_x * other_line.constant - other_step_x * constant, determinant)
+                        y, y_remainder = divmod(step_y * other_line.constant - other_step_y * constant, determinant)
+                        if x_remainder or y_remainder:
+                            continue
+                        point = x, y
+                        if lines[direction][constant].is_covered(point) and other_line.is_covered(point):
+                            crossings.add(point)
+
+    # a crossing is counted once per line on which it lies in a collinear overlap, or once if on none
+    for point in crossings:
+        num_counted = 0
+        for direction in directions:
+            line = lines[direction].get(LineCoverage.get_constant(direction, point))
+            if line is not None and line.is_multiple(point):
+                num_counted += 1
+        total_points += 1 - num_counted
+    return total_points
+
+
+class VentIndex:
+    """Vent segments bucketed by the square grid cells of side bucket_size they pass through."""
+
+    def __init__(self, line_segments: List[LineSegment] = (), bucket_size: int = 64):
+        self.bucket_size = bucket_size
+        self.line_segments = []
+        self.buckets = defaultdict(list)
+        for line_segment in line_segments:
+            self.insert(line_segment)
+
+    def insert(self, line_segment: LineSegment):
+        segment_id = len(self.line_segments)
+        self.line_segments.append(line_segment)
+        for bucket in self.__get_buckets(line_segment):
+            self.buckets[bucket].append(segment_id)
+
+    def count_at(self, point: Tuple[int, int]) -> int:
+        x, y = point
+        bucket = x // self.bucket_size, y // self.bucket_size
+        return sum(1 for segment_id in self.buckets.get(bucket, [])
+                   if self.line_segments[segment_id].clip(x, y, x, y) is not None)
+
+    def count_danger(self, min_x: int, min_y: int, max_x: int, max_y: int) -> int:
+        """Number of cells in the inclusive rectangle covered by at least two vents."""
+        min_bucket_x, max_bucket_x = min_x // self.bucket_size, max_x // self.bucket_size
+        min_bucket_y, max_bucket_y = min_y // self.bucket_size, max_y // self.bucket_size
+        if (max_bucket_x - min_bucket_x + 1) * (max_bucket_y - min_bucket_y + 1) > len(self.buckets):
+            buckets = [(bucket_x, bucket_y) for bucket_x, bucket_y in self.buckets
+                       if min_bucket_x <= bucket_x <= max_bucket_x and min_bucket_y <= bucket_y <= max_bucket_y]
+        else:
+            buckets = itertools.product(range(min_bucket_x, max_bucket_x + 1), range(min_bucket_y, max_bucket_y + 1))
+
+        total_points = 0
+        for bucket_x, bucket_y in buckets:
+            segment_ids = self.buckets.get((bucket_x, bucket_y), [])
+            if len(segment_ids) < 2:
+                continue
+            area = (max(min_x, bucket_x * self.bucket_size), max(min_y, bucket_y * self.bucket_size),
+                    min(max_x, (bucket_x + 1) * self.bucket_size - 1), min(max_y, (bucket_y + 1) * self.bucket_size - 1))
+            total_points += VentIndex.__count_area(area, [self.line_segments[segment_id] for segment_id in segment_ids])
+        return total_points
+
+    def __get_buckets(self, line_segment: LineSegment) -> Iterator[Tuple[int, int]]:
+        (x1, y1), (x2, y2) = line_segment.p1, line_segment.p2
+        step_x, step_y = line_segment.get_step()
+        for bucket_x in range(min(x1, x2) // self.bucket_size, max(x1, x2) // self.bucket_size + 1):
+            steps = line_segment.clip(bucket_x * self.bucket_size, min(y1, y2),
+                                      (bucket_x + 1) * self.bucket_size - 1, max(y1, y2))
+            if steps is None:
+                continue
+            first_y, last_y = y1 + steps[0] * step_y, y1 + steps[1] * step_y
+            for bucket_y in range(min(first_y, last_y) // self.bucket_size,
+                                  max(first_y, last_y) // self.bucket_size + 1):
+                yield bucket_x, bucket_y
+
+    @staticmethod
+    def __count_area(area: Tuple[int, int, int, int], line_segments: List[LineSegment]) -> int:
+        min_x, min_y, max_x, max_y = area
+        width = max_x - min_x + 1
+        grid = np.zeros((max_y - min_y + 1) * width, dtype=np.uint32)
+        for line_segment in line_segments:
+            steps = line_segment.clip(min_x, min_y, max_x, max_y)
+            if steps is None:
+                continue
+            (x1, y1), (step_x, step_y) = line_segment.p1, line_segment.get_step()
+            first, last = [(y1 + step * step_y - min_y) * width + x1 + step * step_x - min_x for step in steps]
+            stride = abs(step_y * width + step_x) or 1
+            grid[min(first, last):max(first, last) + 1:stride] += 1
+        return int(np.count_nonzero(grid > 1))
+
+
+def generate_line_segments(num_segments: int, max_coordinate: int = 1000, max_length: int = 50) -> List[LineSegment]:
+    line_segments = []
+    for _ in range(0, num_segments):
+        x1, y1 = random.randint(0, max_coordinate), random.randint(0, max_coordinate)
+        length = random.randint(0, max_length)
+        step_x, step_y = random.choice([(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)])
+        line_segments.append(LineSegment((x1, y1), (x1 + length * step_x, y1 + length * step_y)))
+    return line_segments
+
+
+def benchmark_rasterization(num_segments: int):
+    line_segments = generate_line_segments(num_segments)
+
+    start_time = time.perf_counter()
+    float_points = sum(len(line_segment.get_grid_points()) for line_segment in line_segments)
+    float_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    integer_points = sum(1 for line_segment in line_segments for _ in line_segment.iter_grid_points())
+    integer_time = time.perf_counter() - start_time
+
+    print(f'segments: {num_segments}, points: {integer_points}')
+    print(f'get_grid_points: {float_time:.3f}s, iter_grid_points: {integer_time:.3f}s')
+    if float_points != integer_points:
+        logging.error('Rasterizers disagree: %d vs %d points', float_points, integer_points)
+
+
 if __name__ == '__main__':
-    line_segments = parse_input()
-    print(puzzle10(line_segments))
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--benchmark', metavar='N', type=int, help='compare the rasterizers on N random segments')
+    parser.add_argument('--auto', action='store_true', help='count overlaps with a dense grid or a Counter')
+    parser.add_argument('--point', metavar='X,Y', help='number of vents covering the point')
+    parser.add_argument('--window', metavar='X1,Y1,X2,Y2', help='number of danger cells in the rectangle')
+    parser.add_argument('--sweep', action='store_true', help='count overlaps analytically from intervals and crossings')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark_rasterization(args.benchmark)
+    elif args.auto:
+        line_segments = parse_input()
+        print(count_overlaps(line_segments, include_diagonals=False))
+        print(count_overlaps(line_segments))
+    elif args.point or args.window:
+        vent_index = VentIndex(parse_input())
+        if args.point:
+            print(vent_index.count_at(tuple(map(int, args.point.split(',')))))
+        if args.window:
+            print(vent_index.count_danger(*map(int, args.window.split(','))))
+    elif args.sweep:
+        line_segments = parse_input()
+        print(sweep_count_overlaps(line_segments, include_diagonals=False))
+        print(sweep_count_overlaps(line_segments))
+    else:
+        line_segments = parse_input()
+        print(puzzle10(line_segments))
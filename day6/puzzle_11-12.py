@@ -1,4 +1,9 @@
-from typing import List
+import argparse
+import json
+from typing import Iterable, List, Optional
+
+NUM_TIMERS = 9
+RESET_TIMER = 6
 
 
 class FishCounter:
@@ -40,8 +45,133 @@ def bottom_up(inital_state, days):
     return result
 
 
+def get_histogram(initial_state: Iterable[int]) -> List[int]:
+    histogram = [0] * NUM_TIMERS
+    for timer in initial_state:
+        histogram[timer] += 1
+    return histogram
+
+
+def get_transition_matrix() -> List[List[int]]:
+    # column t holds the fish a fish with timer t turns into after one day
+    matrix = [[0] * NUM_TIMERS for _ in range(0, NUM_TIMERS)]
+    for timer in range(1, NUM_TIMERS):
+        matrix[timer - 1][timer] = 1
+    matrix[RESET_TIMER][0] = 1
+    matrix[NUM_TIMERS - 1][0] = 1
+    return matrix
+
+
+def matrix_multiply(left: List[List[int]], right: List[List[int]], modulus: Optional[int] = None) -> List[List[int]]:
+    columns = list(zip(*right))
+    product = [[sum(a * b for a, b in zip(row, column)) for column in columns] for row in left]
+    if modulus is not None:
+        product = [[value % modulus for value in row] for row in product]
+    return product
+
+
+def matrix_power(matrix: List[List[int]], exponent: int, modulus: Optional[int] = None) -> List[List[int]]:
+    result = [[int(row == column) for column in range(0, len(matrix))] for row in range(0, len(matrix))]
+    while exponent:
+        if exponent & 1:
+            result = matrix_multiply(result, matrix, modulus)
+        matrix = matrix_multiply(matrix, matrix, modulus)
+        exponent >>= 1
+    return result
+
+
+def count_fish_horizons(initial_state: Iterable[int], horizons: Iterable[int],
+                        modulus: Optional[int] = None) -> List[int]:
+    """Number of fish after each number of days, computed with O(log D) matrix products per horizon."""
+    histogram = get_histogram(initial_state)
+    horizons = list(horizons)
+    transition = get_transition_matrix()
+
+    counts = [0] * len(horizons)
+    current_day, current_power = 0, matrix_power(transition, 0)
+    for index in sorted(range(0, len(horizons)), key=horizons.__getitem__):
+        days = horizons[index]
+        if days < 0:
+            raise ValueError(days)
+        current_power = matrix_multiply(matrix_power(transition, days - current_day, modulus), current_power, modulus)
+        current_day = days
+        total = sum(sum(row[timer] * histogram[timer] for timer in range(0, NUM_TIMERS)) for row in current_power)
+        counts[index] = total % modulus if modulus is not None else total
+    return counts
+
+
+def count_fish(initial_state: Iterable[int], days: int, modulus: Optional[int] = None) -> int:
+    return count_fish_horizons(initial_state, [days], modulus)[0]
+
+
+class PopulationTable:
+    """Population after D days of a school started by a single fish, for every timer and D <= max_days.
+
+    A fish with timer t behaves like a fish with timer 0 delayed by t days, so population[t][D] is
+    counts[max(D - t, 0)] where counts[D] is the population grown from one fish with timer 0.
+    """
+
+    def __init__(self, counts: List[int], modulus: Optional[int] = None):
+        self.counts = counts
+        self.modulus = modulus
+
+    @property
+    def max_days(self) -> int:
+        return len(self.counts) - 1
+
+    def population(self, timer: int, days: int) -> int:
+        if not 0 <= days <= self.max_days:
+            raise ValueError(days)
+        return self.counts[max(days - timer, 0)]
+
+    def count_school(self, school: Iterable[int], days: int) -> int:
+        histogram = get_histogram(school)
+        total = sum(count * self.population(timer, days) for timer, count in enumerate(histogram) if count)
+        return total % self.modulus if self.modulus is not None else total
+
+    def save(self, path: str):
+        with open(path, 'w') as output:
+            json.dump({'modulus': self.modulus, 'counts': self.counts}, output)
+
+    @classmethod
+    def load(cls, path: str) -> 'PopulationTable':
+        with open(path, 'r') as input:
+            table = json.load(input)
+        return cls(table['counts'], table['modulus'])
+
+    @classmethod
+    def build(cls, max_days: int, modulus: Optional[int] = None) -> 'PopulationTable':
+        # a fish with timer 0 becomes fish with timers 6 and 8, which spawn after 7 and 9 more days
+        counts = [1] * (max_days + 1)
+        for days in range(1, max_days + 1):
+            count = (counts[days - 7] if days >= 7 else 1) + (counts[days - 9] if days >= 9 else 1)
+            counts[days] = count % modulus if modulus is not None else count
+        return cls(counts, modulus)
+
+
 if __name__ == '__main__':
-    print(bottom_up(parse_input(), 256))
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--days', metavar='D', type=int, nargs='+', help='horizons for the matrix power engine')
+    parser.add_argument('--modulus', metavar='M', type=int, help='report the counts modulo M')
+    parser.add_argument('--table', metavar='PATH', help='population table to reuse, built up to max(D) if missing')
+    args = parser.parse_args()
+
+    if args.days and args.table:
+        try:
+            table = PopulationTable.load(args.table)
+        except FileNotFoundError:
+            table = None
+        if table is None or table.max_days < max(args.days) or table.modulus != args.modulus:
+            table = PopulationTable.build(max(args.days), args.modulus)
+            table.save(args.table)
+        school = parse_input()
+        for days in args.days:
+            print(days, table.count_school(school, days))
+    elif args.days:
+        for days, count in zip(args.days, count_fish_horizons(parse_input(), args.days, args.modulus)):
+            print(days, count)
+    else:
+        print(bottom_up(parse_input(), 256))
 
     # fish = parse_input()
     # for day in range(1, 257):
@@ -1,4 +1,12 @@
+import argparse
 import operator
+import random
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+CHUNK_SIZE = 16 * 1024 * 1024
 
 
 def parse_input():
@@ -15,8 +23,165 @@ def momentum_distance(positions, center):
     return sum(abs(center - position) * (abs(center - position) + 1) / 2 for position in positions)
 
 
-if __name__ == '__main__':
-    positions = parse_input()
+def linear_cost(positions: np.ndarray, center: int) -> int:
+    return int(np.abs(positions - center).sum())
+
+
+def triangular_cost(positions: np.ndarray, center: int) -> int:
+    distances = np.abs(positions - center)
+    return int((distances * (distances + 1)).sum()) // 2
+
+
+def solve_linear(positions: List[int]) -> Tuple[int, int]:
+    positions = np.asarray(positions, dtype=np.int64)
+    median = int(np.partition(positions, (len(positions) - 1) // 2)[(len(positions) - 1) // 2])
+    return median, linear_cost(positions, median)
+
+
+def solve_triangular(positions: List[int]) -> Tuple[int, int]:
+    # the continuous optimum of sum(d^2 + d) / 2 lies within half a unit of the mean, so the integer
+    # optimum is one of the integers around [mean - 1/2, mean + 1/2]
+    positions = np.asarray(positions, dtype=np.int64)
+    total, count = int(positions.sum()), len(positions)
+    low = (2 * total - count) // (2 * count)
+    high = -((-(2 * total + count)) // (2 * count))
+    return min(((center, triangular_cost(positions, center)) for center in range(low, high + 1)),
+               key=operator.itemgetter(1))
+
+
+class CostModel:
+    """Fuel cost (quadratic * d^2 + linear * d + constant) / denominator of moving a crab by d.
+
+    The denominator must divide the numerator for every integer d, so the cost of each crab is an
+    integer and the cost of a center is the same whether the crabs are divided one by one or in total.
+    """
+
+    def __init__(self, quadratic: int = 0, linear: int = 1, constant: int = 0, denominator: int = 1):
+        if denominator < 1:
+            raise ValueError(denominator)
+        self.quadratic = quadratic
+        self.linear = linear
+        self.constant = constant
+        self.denominator = denominator
+        # the numerator modulo the denominator repeats with period denominator
+        for distance in range(0, denominator):
+            if self.__numerator(distance) % denominator:
+                raise ValueError(f'{denominator} does not divide the cost numerator at distance {distance}')
+
+    def __numerator(self, distance: int) -> int:
+        return self.quadratic * distance * distance + self.linear * distance + self.constant
+
+    def __call__(self, distance: int) -> int:
+        return self.__numerator(distance) // self.denominator
+
+
+LINEAR_COST = CostModel()
+TRIANGULAR_COST = CostModel(quadratic=1, linear=1, denominator=2)
+
+
+def get_histogram(positions: List[int]) -> np.ndarray:
+    return np.bincount(np.asarray(positions, dtype=np.int64))
+
+
+def load_histogram(path='input.txt', chunk_size: int = CHUNK_SIZE) -> np.ndarray:
+    histogram = np.zeros(0, dtype=np.int64)
+    remainder = b''
+    with open(path, 'rb') as input:
+        while True:
+            chunk = input.read(chunk_size)
+            data = remainder + chunk
+            # a number cut by the chunk boundary is carried over to the next chunk
+            split = data.rfind(b',') + 1 if chunk else len(data)
+            data, remainder = data[:split], data[split:]
+            positions = np.fromstring(data.replace(b',', b' '), dtype=np.int64, sep=' ')
+            if len(positions):
+                if positions.min() < 0:
+                    raise ValueError(int(positions.min()))
+                chunk_histogram = np.bincount(positions)
+                if len(chunk_histogram) > len(histogram):
+                    histogram = np.pad(histogram, (0, len(chunk_histogram) - len(histogram)))
+                histogram[:len(chunk_histogram)] += chunk_histogram
+            if not chunk:
+                return histogram
+
+
+def cost_curve(histogram: np.ndarray, cost_model: CostModel = TRIANGULAR_COST) -> Tuple[int, np.ndarray]:
+    """Returns the first candidate center and the total cost of every center up to the last crab.
+
+    With x and p taken relative to the first crab, sum(h[p] * (x - p)^2) = N x^2 - 2 x S1 + S2 and
+    sum(h[p] * |x - p|) = x (2 L(x) - N) - 2 SL(x) + S1, where L and SL are running sums of h[p] and
+    h[p] * p. The squared sums are switched to Python integers when they could overflow int64.
+    """
+    present = np.flatnonzero(histogram)
+    if not len(present):
+        raise ValueError('the histogram contains no crabs')
+    min_pos, max_pos = int(present[0]), int(present[-1])
+    counts = histogram[min_pos:max_pos + 1].astype(np.int64)
+    offsets = np.arange(0, len(counts), dtype=np.int64)
+
+    total_count = int(counts.sum())
+    weighted_offsets = counts * offsets
+    total_offset = int(weighted_offsets.sum())
+    absolute = offsets * (2 * np.cumsum(counts) - total_count) - 2 * np.cumsum(weighted_offsets) + total_offset
+
+    curve = cost_model.linear * absolute + cost_model.constant * total_count
+    if cost_model.quadratic:
+        max_squared = total_count * (max_pos - min_pos) ** 2 * abs(cost_model.quadratic)
+        if max_squared >= 2 ** 62:
+            offsets, weighted_offsets, curve = offsets.astype(object), weighted_offsets.astype(object), curve.astype(object)
+        total_squared = int((weighted_offsets * offsets).sum())
+        curve = curve + cost_model.quadratic * (total_count * offsets * offsets - 2 * total_offset * offsets
+                                                + total_squared)
+    return min_pos, curve // cost_model.denominator
+
+
+def solve_curve(histogram: np.ndarray, cost_model: CostModel = TRIANGULAR_COST) -> Tuple[int, int]:
+    min_pos, curve = cost_curve(histogram, cost_model)
+    index = int(np.argmin(curve))
+    return min_pos + index, int(curve[index])
+
+
+def benchmark_solvers(num_crabs: int, max_position: int, num_sampled_centers: int = 3):
+    positions = [random.randint(0, max_position) for _ in range(0, num_crabs)]
+
+    start_time = time.perf_counter()
+    linear_solution, triangular_solution = solve_linear(positions), solve_triangular(positions)
+    solver_time = time.perf_counter() - start_time
+
+    # the brute force evaluates every center in the range, timed on a few of them and extrapolated
     min_pos, max_pos = min(positions), max(positions)
-    values = [(center, momentum_distance(positions, center)) for center in range(min_pos, max_pos + 1, 1)]
-    print(min(values, key=operator.itemgetter(1))[1])
+    start_time = time.perf_counter()
+    for center in random.sample(range(min_pos, max_pos + 1), num_sampled_centers):
+        absolute_distance(positions, center)
+        momentum_distance(positions, center)
+    brute_force_time = (time.perf_counter() - start_time) / num_sampled_centers * (max_pos - min_pos + 1)
+
+    print(f'crabs: {num_crabs}, positions up to {max_position}')
+    print(f'linear: {linear_solution}, triangular: {triangular_solution}')
+    print(f'closed form: {solver_time:.3f}s, brute force (estimated): {brute_force_time:.0f}s')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--closed-form', action='store_true', help='use the median and mean based solvers')
+    parser.add_argument('--benchmark', metavar='N', type=int, help='compare the solvers on N random crabs')
+    parser.add_argument('--curve', metavar='PATH', help='print the linear and triangular cost of every center in PATH')
+    args = parser.parse_args()
+
+    if args.curve:
+        crab_histogram = load_histogram(args.curve)
+        min_center, linear_curve = cost_curve(crab_histogram, LINEAR_COST)
+        _, triangular_curve = cost_curve(crab_histogram, TRIANGULAR_COST)
+        for offset, (linear, triangular) in enumerate(zip(linear_curve.tolist(), triangular_curve.tolist())):
+            print(min_center + offset, linear, triangular)
+    elif args.benchmark:
+        benchmark_solvers(args.benchmark, 10 ** 6)
+    elif args.closed_form:
+        positions = parse_input()
+        print(solve_linear(positions)[1])
+        print(solve_triangular(positions)[1])
+    else:
+        positions = parse_input()
+        min_pos, max_pos = min(positions), max(positions)
+        values = [(center, momentum_distance(positions, center)) for center in range(min_pos, max_pos + 1, 1)]
+        print(min(values, key=operator.itemgetter(1))[1])
@@ -1,5 +1,9 @@
+import argparse
+import itertools
+import multiprocessing
+import time
 from collections import Counter
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 
 
 class Pattern:
@@ -174,6 +178,118 @@ def decode(line: str):
     return int(''.join([str(solution.get_digit(pattern)) for pattern in right_patterns]))
 
 
+SEGMENT_BITS = {segment: 1 << index for index, segment in enumerate('abcdefg')}
+MASK_CACHE: Dict[str, int] = {}
+
+
+def pattern_mask(text: str) -> int:
+    mask = MASK_CACHE.get(text)
+    if mask is None:
+        mask = 0
+        for segment in text:
+            mask |= SEGMENT_BITS[segment]
+        MASK_CACHE[text] = mask
+    return mask
+
+
+def deduce_digits(masks: List[int]) -> bytearray:
+    """Returns a lookup from each of the ten wire masks to its digit."""
+    by_length = [[] for _ in range(0, 8)]
+    for mask in masks:
+        by_length[mask.bit_count()].append(mask)
+    one, seven, four, eight = by_length[2][0], by_length[3][0], by_length[4][0], by_length[7][0]
+
+    digits = bytearray(128)
+    digits[one], digits[seven], digits[four], digits[eight] = 1, 7, 4, 8
+    for mask in by_length[6]:
+        if mask & four == four:
+            digits[mask] = 9
+        elif mask & one == one:
+            digits[mask] = 0
+        else:
+            digits[mask] = 6
+    for mask in by_length[5]:
+        if mask & one == one:
+            digits[mask] = 3
+        elif (mask & four).bit_count() == 3:
+            digits[mask] = 5
+        else:
+            digits[mask] = 2
+    return digits
+
+
+def bitmask_decode(line: str) -> int:
+    patterns = line.split()
+    separator = patterns.index('|')
+    digits = deduce_digits([MASK_CACHE.get(pattern) or pattern_mask(pattern) for pattern in patterns[:separator]])
+    value = 0
+    for pattern in patterns[separator + 1:]:
+        value = value * 10 + digits[MASK_CACHE.get(pattern) or pattern_mask(pattern)]
+    return value
+
+
+CANONICAL_DIGITS = {0: 'abcefg', 1: 'cf', 2: 'acdeg', 3: 'acdfg', 4: 'bcdf',
+                    5: 'abdfg', 6: 'abdefg', 7: 'acf', 8: 'abcdefg', 9: 'abcdfg'}
+BATCH_LINES = 1 << 14
+
+
+def get_signature_table() -> Dict[int, int]:
+    # a segment's frequency across the ten digits survives any rewiring and so does a digit's sum of them
+    frequencies = Counter(''.join(CANONICAL_DIGITS.values()))
+    table = {sum(frequencies[segment] for segment in pattern): digit for digit, pattern in CANONICAL_DIGITS.items()}
+    assert len(table) == len(CANONICAL_DIGITS)
+    return table
+
+
+SIGNATURE_TO_DIGIT = get_signature_table()
+
+
+def signature_decode(line: str) -> int:
+    patterns = line.split()
+    separator = patterns.index('|')
+    frequencies = Counter(''.join(patterns[:separator]))
+    value = 0
+    for pattern in patterns[separator + 1:]:
+        value = value * 10 + SIGNATURE_TO_DIGIT[sum(frequencies[segment] for segment in pattern)]
+    return value
+
+
+def decode_batch(lines: List[str]) -> List[int]:
+    return [signature_decode(line) for line in lines if line.strip()]
+
+
+def batch_decode(lines: Iterable[str], num_workers: int = None, batch_lines: int = BATCH_LINES) -> Iterator[int]:
+    """Decodes the lines in a process pool, yielding the values in input order."""
+    lines = iter(lines)
+    batches = iter(lambda: list(itertools.islice(lines, batch_lines)), [])
+    with multiprocessing.Pool(num_workers) as pool:
+        for values in pool.imap(decode_batch, batches):
+            yield from values
+
+
+def benchmark_decoders(lines: List[str]):
+    for decoder in [decode, bitmask_decode, signature_decode]:
+        start_time = time.perf_counter()
+        total = sum(decoder(line) for line in lines)
+        elapsed_time = time.perf_counter() - start_time
+        print(f'{decoder.__name__}: {total}, {elapsed_time / len(lines) * 1e6:.2f}us per line')
+
+
 if __name__ == '__main__':
-    length_counter = Counter()
-    print(sum(decode(line) for line in get_input()))
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--bitmask', action='store_true', help='decode the displays with 7-bit wire masks')
+    parser.add_argument('--batch', metavar='PATH', help='decode PATH with signatures in a process pool')
+    parser.add_argument('--workers', metavar='N', type=int, help='number of worker processes')
+    parser.add_argument('--benchmark', action='store_true', help='compare the per-line cost of the decoders')
+    args = parser.parse_args()
+
+    if args.batch:
+        with open(args.batch, 'r') as input:
+            print(sum(batch_decode(input, args.workers)))
+    elif args.benchmark:
+        benchmark_decoders(get_input())
+    elif args.bitmask:
+        print(sum(bitmask_decode(line) for line in get_input()))
+    else:
+        length_counter = Counter()
+        print(sum(decode(line) for line in get_input()))
@@ -1,3 +1,12 @@
+import argparse
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+BASIN_BORDER = 9
+
+
 def parse_test_input():
     return [[2, 1, 9, 9, 9, 4, 3, 2, 1, 0],
             [3, 9, 8, 7, 8, 9, 4, 9, 2, 1],
@@ -40,6 +49,30 @@ def get_low_points(board):
     return low_points
 
 
+def load_height_array(path: str = 'input.txt') -> np.ndarray:
+    with open(path, 'rb') as input:
+        lines = [line for line in input.read().split() if line]
+    if not lines:
+        return np.empty((0, 0), dtype=np.uint8)
+    digits = np.frombuffer(b''.join(lines), dtype=np.uint8) - ord('0')
+    return digits.reshape(len(lines), len(lines[0]))
+
+
+def vectorized_low_points(heights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the row and column indices of the low points in raster order."""
+    heights = np.asarray(heights, dtype=np.uint8)
+    padded = np.pad(heights, 1, constant_values=BASIN_BORDER + 1)
+    is_low = ((heights < padded[:-2, 1:-1]) & (heights < padded[2:, 1:-1])
+              & (heights < padded[1:-1, :-2]) & (heights < padded[1:-1, 2:]))
+    return np.nonzero(is_low)
+
+
+def vectorized_risk_level(heights: np.ndarray) -> int:
+    heights = np.asarray(heights, dtype=np.uint8)
+    low_points = vectorized_low_points(heights)
+    return int(heights[low_points].sum(dtype=np.int64)) + len(low_points[0])
+
+
 def get_basin_size(board, point):
     dim = get_dim(board)
     to_visit = [point]
@@ -70,7 +103,101 @@ def get_basin_sizes(board):
     return [get_basin_size(board, lp) for lp in get_low_points(board)]
 
 
+def get_runs(heights: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Returns the row, first column and end column of every horizontal run of basin cells in raster order."""
+    num_rows, num_cols = heights.shape
+    padded = np.zeros((num_rows, num_cols + 2), dtype=np.int8)
+    padded[:, 1:-1] = heights != BASIN_BORDER
+    steps = np.diff(padded, axis=1).ravel()
+    begins, ends = np.flatnonzero(steps == 1), np.flatnonzero(steps == -1)
+    return begins // (num_cols + 1), begins % (num_cols + 1), ends % (num_cols + 1)
+
+
+def find_roots(num_nodes: int, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    # union-find in bulk: hook the larger root of every edge under the smaller, then jump pointers
+    parents = np.arange(0, num_nodes, dtype=np.int64)
+    while True:
+        left_roots, right_roots = parents[left], parents[right]
+        is_split = left_roots != right_roots
+        if not is_split.any():
+            return parents
+        left_roots, right_roots = left_roots[is_split], right_roots[is_split]
+        np.minimum.at(parents, np.maximum(left_roots, right_roots), np.minimum(left_roots, right_roots))
+        while True:
+            grandparents = parents[parents]
+            if np.array_equal(grandparents, parents):
+                break
+            parents = grandparents
+
+
+def label_runs(heights: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Returns the runs of basin cells together with the root run of the basin each belongs to."""
+    num_cols = heights.shape[1]
+    rows, begins, ends = get_runs(heights)
+    begin_keys, end_keys = rows * (num_cols + 1) + begins, rows * (num_cols + 1) + ends
+
+    # the runs of the previous row overlapping a run form a contiguous range of the raster order
+    previous_row_keys = (rows - 1) * (num_cols + 1)
+    first_overlaps = np.searchsorted(end_keys, previous_row_keys + begins, side='right')
+    last_overlaps = np.searchsorted(begin_keys, previous_row_keys + ends, side='left')
+    num_overlaps = np.maximum(last_overlaps - first_overlaps, 0)
+    lower_runs = np.repeat(np.arange(0, len(rows)), num_overlaps)
+    group_offsets = np.arange(0, len(lower_runs)) - np.repeat(np.cumsum(num_overlaps) - num_overlaps, num_overlaps)
+    upper_runs = np.repeat(first_overlaps, num_overlaps) + group_offsets
+    return rows, begins, ends, find_roots(len(rows), lower_runs, upper_runs)
+
+
+def labeled_basin_sizes(heights: np.ndarray) -> List[int]:
+    _, begins, ends, roots = label_runs(np.asarray(heights))
+    sizes = np.zeros(len(roots), dtype=np.int64)
+    np.add.at(sizes, roots, ends - begins)
+    return sizes[sizes > 0].tolist()
+
+
+def label_basins(heights: np.ndarray) -> np.ndarray:
+    """Returns the basin number of every cell, starting from 1, and 0 for the cells of height 9."""
+    heights = np.asarray(heights)
+    rows, begins, ends, roots = label_runs(heights)
+    _, basin_numbers = np.unique(roots, return_inverse=True)
+    labels = np.zeros(heights.size, dtype=np.int32)
+    run_lengths = ends - begins
+    cell_offsets = np.arange(0, int(run_lengths.sum())) - np.repeat(np.cumsum(run_lengths) - run_lengths, run_lengths)
+    cells = np.repeat(rows * heights.shape[1] + begins, run_lengths) + cell_offsets
+    labels[cells] = np.repeat(basin_numbers + 1, run_lengths)
+    return labels.reshape(heights.shape)
+
+
+def top_basins_product(basin_sizes: List[int], k: int = 3) -> int:
+    product = 1
+    for basin_size in sorted(basin_sizes, reverse=True)[:k]:
+        product *= basin_size
+    return product
+
+
+def benchmark_labeling(size: int, border_probability: float = 0.25):
+    heights = np.where(np.random.rand(size, size) < border_probability, BASIN_BORDER, 0).astype(np.uint8)
+    start_time = time.perf_counter()
+    basin_sizes = labeled_basin_sizes(heights)
+    elapsed_time = time.perf_counter() - start_time
+    print(f'size: {size}x{size}, basins: {len(basin_sizes)}, time: {elapsed_time:.3f}s, '
+          f'cells/s: {heights.size / elapsed_time:.0f}, product: {top_basins_product(basin_sizes)}')
+
+
 if __name__ == '__main__':
-    basin_sizes = get_basin_sizes(parse_file_input())
-    basin_sizes.sort(reverse=True)
-    print(basin_sizes[0] * basin_sizes[1] * basin_sizes[2])
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--risk', action='store_true', help='print the risk level of the low points')
+    parser.add_argument('--labeled', action='store_true', help='find the basins by labeling runs of basin cells')
+    parser.add_argument('--top', metavar='K', type=int, default=3, help='number of the largest basins to multiply')
+    parser.add_argument('--benchmark', metavar='N', type=int, help='label the basins of a random NxN heightmap')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark_labeling(args.benchmark)
+    elif args.risk:
+        print(vectorized_risk_level(load_height_array()))
+    elif args.labeled:
+        print(top_basins_product(labeled_basin_sizes(load_height_array()), args.top))
+    else:
+        basin_sizes = get_basin_sizes(parse_file_input())
+        basin_sizes.sort(reverse=True)
+        print(basin_sizes[0] * basin_sizes[1] * basin_sizes[2])